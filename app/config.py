@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import List
 from pydantic import BaseModel
 import os
 
@@ -9,6 +10,78 @@ class Settings(BaseModel):
     # MongoDB
     mongo_url: str = os.getenv("MONGO_URL", "mongodb://localhost:27017")
     mongo_db: str = os.getenv("MONGO_DB", "mockapi")
+    # Connection pool and timeouts (per worker process); 0 means no limit.
+    # Wire compressors are offered in order, e.g. "zstd,snappy,zlib" (zstd/snappy need their packages)
+    mongo_max_pool_size: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    mongo_min_pool_size: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    mongo_max_idle_time_ms: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "0"))
+    mongo_wait_queue_timeout_ms: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "0"))
+    mongo_server_selection_timeout_ms: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    mongo_connect_timeout_ms: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "20000"))
+    mongo_socket_timeout_ms: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0"))
+    mongo_compressors: List[str] = [c for c in os.getenv("MONGO_COMPRESSORS", "").split(",") if c]
+    # ساخت ایندکس‌ها در استارتاپ؛ مهاجرت داده‌ها فقط با `python -m app.db.migrations`
+    create_indexes_on_startup: bool = os.getenv("CREATE_INDEXES_ON_STARTUP", "true").lower() == "true"
+
+    # Fake data: seed an empty database at startup (`python -m app.seed` for large loads)
+    seed_on_startup: bool = os.getenv("SEED_ON_STARTUP", "false").lower() == "true"
+    seed_products: int = int(os.getenv("SEED_PRODUCTS", "100"))  # other collections scale with it
+    seed: int = int(os.getenv("SEED", "42"))
+    seed_workers: int = int(os.getenv("SEED_WORKERS", "1"))  # >1 uses a process pool
+
+    # Product search: "text" (Mongo text index), "memory" (in-process inverted index) or "regex"
+    product_search_engine: str = os.getenv("PRODUCT_SEARCH_ENGINE", "text")
+
+    # Bulk export: documents fetched per Mongo round trip
+    export_batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Bulk writes: max items per request and documents per insert_many/bulk_write
+    bulk_max_items: int = int(os.getenv("BULK_MAX_ITEMS", "50000"))
+    bulk_chunk_size: int = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+    # Uploads: streamed to disk as they arrive; limits are checked while streaming
+    upload_dir: str = os.getenv("UPLOAD_DIR", "uploads")
+    upload_max_file_size: int = int(os.getenv("UPLOAD_MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # bytes
+    upload_max_files: int = int(os.getenv("UPLOAD_MAX_FILES", "20"))  # per request
+    # Staging for files still being received; kept outside /static and on the same
+    # filesystem as UPLOAD_DIR so the final rename is atomic (empty: "<UPLOAD_DIR>.incoming")
+    upload_incoming_dir: str = os.getenv("UPLOAD_INCOMING_DIR", "")
+
+    # Image derivatives (needs Pillow): name:longest-side pairs, rendered in every
+    # format this Pillow build can encode; the first format is the one exposed on File.variants
+    image_variants: List[str] = os.getenv("IMAGE_VARIANTS", "thumb:160,medium:640").split(",")
+    image_formats: List[str] = os.getenv("IMAGE_FORMATS", "webp,avif").split(",")
+    image_quality: int = int(os.getenv("IMAGE_QUALITY", "80"))
+    image_workers: int = int(os.getenv("IMAGE_WORKERS", "2"))  # rendering processes
+
+    # /static: upload names never change content, so they are cached as immutable;
+    # small files are kept in memory (STATIC_HOT_CACHE_SIZE=0 disables)
+    static_cache_control: str = os.getenv("STATIC_CACHE_CONTROL", "public, max-age=31536000, immutable")
+    static_hot_cache_size: int = int(os.getenv("STATIC_HOT_CACHE_SIZE", str(64 * 1024 * 1024)))  # bytes in total
+    static_hot_max_file_size: int = int(os.getenv("STATIC_HOT_MAX_FILE_SIZE", str(256 * 1024)))  # bytes per file
+
+    # Reads: populated responses are assembled from already-validated models
+    # without validating them again; VALIDATE_READS=true re-validates (debugging)
+    validate_reads: bool = os.getenv("VALIDATE_READS", "false").lower() == "true"
+
+    # Prometheus metrics at /metrics (per process)
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Pagination
+    count_cache_ttl: float = float(os.getenv("COUNT_CACHE_TTL", "5"))  # seconds, 0 disables
+
+    # Read-through cache for brands, categories, warehouses, stores and files
+    entity_cache_size: int = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))  # entries per collection
+    entity_cache_ttl: float = float(os.getenv("ENTITY_CACHE_TTL", "60"))  # seconds, 0 disables
+
+    # Response compression; br/zstd are used only when brotli/zstandard are installed
+    compression_enabled: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+    compression_encodings: List[str] = os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip").split(",")
+    compression_types: List[str] = os.getenv(
+        "COMPRESSION_TYPES",
+        "application/json,application/x-ndjson,text/,application/javascript,image/svg+xml",
+    ).split(",")
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,55 @@
+import logging
+from typing import Dict, List
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+def index_registry() -> Dict[str, List[IndexModel]]:
+    """
+    Collection name -> indexes declared on the owning service (``Service.indexes``).
+    Services are imported lazily so the db layer does not depend on them at import time.
+    """
+    from app.services.brand_service import brand_service
+    from app.services.category_service import category_service
+    from app.services.file_service import file_service
+    from app.services.product_service import product_service
+    from app.services.store_service import store_service
+    from app.services.user_service import user_service
+    from app.services.warehouse_service import warehouse_service
+
+    services = [
+        brand_service,
+        category_service,
+        file_service,
+        product_service,
+        store_service,
+        user_service,
+        warehouse_service,
+    ]
+    return {s.collection.name: list(s.indexes) for s in services}
+
+
+async def apply_indexes(db, registry: Dict[str, List[IndexModel]] | None = None, dry_run: bool = False) -> Dict[str, List[str]]:
+    """
+    Create every registered index that does not exist yet (matched by name).
+    Safe to run repeatedly; returns ``{collection: [created index names]}``.
+    """
+    registry = index_registry() if registry is None else registry
+    created: Dict[str, List[str]] = {}
+    for name, models in registry.items():
+        existing = await db[name].index_information()
+        missing = [m for m in models if m.document["name"] not in existing]
+        if not missing:
+            continue
+        if not dry_run:
+            try:
+                await db[name].create_indexes(missing)
+            except OperationFailure as e:
+                # مثلاً داده‌ی تکراری روی ایندکس unique؛ بقیه‌ی کالکشن‌ها را ادامه بده
+                logger.error("Creating indexes on %s failed: %s", name, e)
+                continue
+        created[name] = [m.document["name"] for m in missing]
+    return created
@@ -0,0 +1,150 @@
+"""
+Schema bootstrap: indexes declared on the services plus one-shot data migrations.
+
+Run offline before a deploy with::
+
+    python -m app.db.migrations            # indexes + pending data migrations
+    python -m app.db.migrations --dry-run  # only report what would change
+"""
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+from uuid import UUID
+
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import OperationFailure
+
+from app.db.indexes import apply_indexes
+from app.services.versions import CollectionVersions
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "_migrations"
+
+MigrationFn = Callable[[object], Awaitable[None]]
+
+# ترتیب ثبت = ترتیب اجرا
+MIGRATIONS: Dict[str, MigrationFn] = {}
+
+
+def migration(name: str):
+    """Register a data migration; ``name`` must be unique and is recorded once applied."""
+    def decorator(fn: MigrationFn) -> MigrationFn:
+        if name in MIGRATIONS:
+            raise ValueError(f"Migration {name} is already registered")
+        MIGRATIONS[name] = fn
+        return fn
+    return decorator
+
+
+@dataclass
+class MigrationReport:
+    indexes: Dict[str, List[str]] = field(default_factory=dict)
+    migrations: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [f"created index {c}.{i}" for c, names in self.indexes.items() for i in names]
+        lines += [f"applied migration {m}" for m in self.migrations]
+        return "\n".join(lines) or "nothing to do"
+
+
+class MigrationManager:
+    def __init__(self, db):
+        self.db = db
+        self.applied = db[MIGRATIONS_COLLECTION]
+
+    async def pending(self) -> List[str]:
+        done = {doc["_id"] async for doc in self.applied.find({}, {"_id": 1})}
+        return [name for name in MIGRATIONS if name not in done]
+
+    async def run(self, indexes: bool = True, data: bool = True, dry_run: bool = False) -> MigrationReport:
+        report = MigrationReport()
+        # مهاجرت داده قبل از ایندکس‌ها، تا ایندکس‌های unique روی داده‌ی نهایی ساخته شوند
+        if data:
+            for name in await self.pending():
+                if not dry_run:
+                    logger.info("Applying migration %s", name)
+                    await MIGRATIONS[name](self.db)
+                    await self.applied.insert_one({"_id": name, "applied_at": datetime.utcnow()})
+                report.migrations.append(name)
+            if report.migrations and not dry_run:
+                await self._bump_versions()
+        if indexes:
+            report.indexes = await apply_indexes(self.db, dry_run=dry_run)
+        return report
+
+    async def _bump_versions(self) -> None:
+        """Data migrations write around the services; move every collection's version so ETags and caches notice."""
+        versions = CollectionVersions(self.db["_versions"])
+        for name in await self.db.list_collection_names():
+            if not name.startswith(("_", "system.")):
+                await versions.bump(name)
+
+
+# --- data migrations ---------------------------------------------------------
+
+def _as_uuid(value) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+async def _rekey(collection, query: dict, key: str, chunk_size: int = 1000) -> None:
+    """Move each matching document to ``_id = UUID(doc[key])``, dropping the legacy ``id`` field."""
+    ops = []
+    async for doc in collection.find(query):
+        new_doc = {k: v for k, v in doc.items() if k not in ("_id", "id")}
+        ops.append(ReplaceOne({"_id": _as_uuid(doc[key])}, new_doc, upsert=True))
+        ops.append(DeleteOne({"_id": doc["_id"]}))
+        if len(ops) >= chunk_size:
+            await collection.bulk_write(ops, ordered=True)
+            ops = []
+    if ops:
+        await collection.bulk_write(ops, ordered=True)
+
+
+@migration("0001_uuid_primary_keys")
+async def uuid_primary_keys(db) -> None:
+    # brands/warehouses/files: ObjectId در _id و UUID باینری در id
+    # categories: ObjectId در _id و UUID رشته‌ای در id
+    for name in ("brands", "categories", "files", "warehouses"):
+        await _rekey(db[name], {"id": {"$exists": True}}, "id")
+        try:
+            await db[name].drop_index("id_1")
+        except OperationFailure:
+            pass
+    # products/stores/users: UUID رشته‌ای در _id
+    for name in ("products", "stores", "users"):
+        await _rekey(db[name], {"_id": {"$type": "string"}}, "_id")
+
+
+# سندهای قدیمی (پیش از created_at/updated_at) همه یک زمان ثابت می‌گیرند؛ _id ترتیب بینشان را تعیین می‌کند
+LEGACY_TIMESTAMP = datetime(1970, 1, 1)
+
+
+@migration("0002_backfill_timestamps")
+async def backfill_timestamps(db) -> None:
+    # کرسر روی (created_at, _id) است و شرط $lt هیچ‌وقت با فیلد ناموجود جور نمی‌شود
+    for name in ("brands", "categories", "files", "products", "stores", "users", "warehouses"):
+        await db[name].update_many({"created_at": {"$exists": False}}, {"$set": {"created_at": LEGACY_TIMESTAMP}})
+        if name != "files":
+            await db[name].update_many({"updated_at": {"$exists": False}}, {"$set": {"updated_at": LEGACY_TIMESTAMP}})
+
+
+async def main(argv: List[str] | None = None) -> MigrationReport:
+    parser = argparse.ArgumentParser(prog="python -m app.db.migrations", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report pending changes without applying them")
+    parser.add_argument("--indexes-only", action="store_true", help="skip data migrations")
+    args = parser.parse_args(argv)
+
+    from app.db.mongo import db
+
+    report = await MigrationManager(db).run(data=not args.indexes_only, dry_run=args.dry_run)
+    print(report.summary())
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,14 +1,34 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson.codec_options import CodecOptions
 from bson.binary import UuidRepresentation
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.db.monitoring import command_monitor, pool_monitor
 
 settings = get_settings()
 
+
+def client_options(settings: Settings) -> dict:
+    """Pool, timeout and compression options for ``MongoClient``/``AsyncIOMotorClient``."""
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        # صفر یعنی بدون محدودیت؛ pymongo برای آن None می‌خواهد
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms or None,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms or None,
+        "socketTimeoutMS": settings.mongo_socket_timeout_ms or None,
+    }
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+
 client = AsyncIOMotorClient(
     settings.mongo_url,
-    serverSelectionTimeoutMS=5000,
     uuidRepresentation="standard",
+    event_listeners=[pool_monitor, command_monitor],
+    **client_options(settings),
 )
 
 db = client.get_database(
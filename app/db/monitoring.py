@@ -0,0 +1,162 @@
+"""
+Connection pool and command instrumentation. Motor runs pymongo in worker
+threads, so the listener callbacks arrive on those threads; shared state is
+updated under a lock.
+"""
+import threading
+from collections import Counter, defaultdict
+from typing import Dict
+
+from prometheus_client import Counter as PromCounter, Histogram
+from pymongo import monitoring
+
+
+class _PoolStats:
+    def __init__(self):
+        self.size = 0  # اتصال‌های باز (در استخر یا در حال استفاده)
+        self.in_use = 0
+        self.created = 0
+        self.closed: Counter = Counter()  # به تفکیک دلیل
+        self.cleared = 0
+        self.checkouts = 0
+        self.checkout_failures: Counter = Counter()
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "connections_created": self.created,
+            "connections_closed": dict(self.closed),
+            "pool_cleared": self.cleared,
+            "checkouts": self.checkouts,
+            "checkout_failures": dict(self.checkout_failures),
+            "checkout_wait_avg_ms": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else None,
+            "checkout_wait_max_ms": round(self.wait_seconds_max * 1000, 3),
+        }
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Per-server pool counters: current size and connections in use, connection
+    churn, and how long checkouts waited for a connection. A high wait time or
+    ``in_use`` sitting at ``maxPoolSize`` means requests are queueing for the pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: Dict[str, _PoolStats] = defaultdict(_PoolStats)
+
+    def _pool(self, address) -> _PoolStats:
+        return self._pools[f"{address[0]}:{address[1]}"]
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address).cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.size += 1
+            pool.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.size -= 1
+            pool.closed[event.reason] += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._pool(event.address).checkout_failures[event.reason] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.in_use += 1
+            pool.checkouts += 1
+            pool.wait_seconds_total += event.duration
+            pool.wait_seconds_max = max(pool.wait_seconds_max, event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._pool(event.address).in_use -= 1
+
+    def stats(self) -> Dict[str, dict]:
+        """Counters by server address."""
+        with self._lock:
+            return {address: pool.as_dict() for address, pool in self._pools.items()}
+
+
+pool_monitor = PoolMonitor()
+
+
+# زمان دستورها از چند صد میکروثانیه تا چند ثانیه
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round-trip time, by command and collection",
+    ["command", "collection"],
+    buckets=COMMAND_BUCKETS,
+)
+MONGO_COMMAND_FAILURES = PromCounter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error, by command and collection",
+    ["command", "collection"],
+)
+
+
+def _collection(command_name: str, command) -> str:
+    # نام کالکشن مقدار خود دستور است (find: "products")؛ getMore آن را جدا می‌فرستد
+    target = command.get("collection") if command_name == "getMore" else command.get(command_name)
+    return target if isinstance(target, str) else ""
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Records every command's duration in ``mongodb_command_duration_seconds``.
+    Only the started event carries the command document, so its collection is
+    kept until the matching succeeded/failed event arrives.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, str] = {}
+
+    def started(self, event):
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = _collection(event.command_name, event.command)
+
+    def _finish(self, event) -> str:
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), "")
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+
+command_monitor = CommandMonitor()
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from uuid import UUID
+from typing import List, Literal, Optional
+
+
+class BulkItemResult(BaseModel):
+    index: int                      # جایگاه آیتم در بدنه‌ی درخواست
+    id: Optional[UUID] = None
+    status: Literal["created", "updated", "deleted", "not_found", "invalid", "failed"]
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    items: List[BulkItemResult]
+
+    @classmethod
+    def from_items(cls, items: List[BulkItemResult]) -> "BulkResult":
+        items = sorted(items, key=lambda r: r.index)
+        ok = sum(1 for r in items if r.status in ("created", "updated", "deleted"))
+        return cls(total=len(items), succeeded=ok, failed=len(items) - ok, items=items)
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic import BaseModel, Field
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -8,6 +10,10 @@ class FileBase(BaseModel):
     filename: str
     content_type: str | None = None
     size: int | None = None
+    # هش محتوا؛ فایل‌های با محتوای یکسان یک بلاب مشترک روی دیسک دارند
+    sha256: str | None = None
+    # نسخه‌های کوچک‌شده‌ی تصویر (مثلاً thumb و medium)؛ برای فایل‌های غیرتصویری None
+    variants: Dict[str, str] | None = None
 
 
 class FileCreate(FileBase):
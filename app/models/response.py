@@ -18,12 +18,13 @@ class ApiErrorResponse(BaseModel):
 
 
 class PaginationMeta(BaseModel):
-    page: int
+    page: Optional[int] = None   # در حالت cursor مقدار ندارد
     limit: int
-    total: int
+    total: Optional[int] = None   # با include_total=false شمرده نمی‌شود
     total_pages: Optional[int] = None
     has_next: Optional[bool] = None
     has_previous: Optional[bool] = None
+    next_cursor: Optional[str] = None
 
 
 class SuccessMeta(BaseModel):
@@ -1,11 +1,18 @@
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from typing import Optional, List
 
 from app.models.brand import Brand, BrandCreate, BrandUpdate
-from app.models.response import ApiSuccessResponse, SuccessMeta, PaginationMeta
+from app.models.response import ApiSuccessResponse, SuccessMeta
 from app.services.brand_service import brand_service
 from app.services.file_service import file_service
+from app.models.bulk import BulkItemResult, BulkResult
+from app.services.fields import parse_fields
+from app.web.conditional import entity_validators, list_validators
+from app.web.responses import success_response
+from app.web.bulk import bulk_openapi, parse_create_items, parse_ids, parse_update_items, read_bulk_items
+from app.web.streaming import ExportFormat, export_response
 
 router = APIRouter()
 
@@ -17,16 +24,24 @@ async def list_brands(
     country: Optional[str] = Query(None, description="Filter by brand country"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.pagination.next_cursor (replaces page)"),
+    include_total: bool = Query(True, description="Count matching documents; disable for faster deep listings"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
 ):
+    selected = parse_fields(fields, Brand)
+    validators = await list_validators(request, "brands")
+    if validators.matches(request):
+        return validators.not_modified()
+
     filters = {}
     if name:
         filters["name"] = name
     if country:
         filters["country"] = country
 
-    items, total = await brand_service.list(filters, page, limit)
+    result = await brand_service.list(filters, page, limit, cursor, include_total, fields=selected)
 
-    pagination = PaginationMeta(page=page, limit=limit, total=total)
+    pagination = result.meta(page, limit, cursor)
     meta = SuccessMeta(
         message="brands.list.success",
         method=request.method,
@@ -34,7 +49,18 @@ async def list_brands(
         host=request.client.host if request.client else None,
         pagination=pagination,  # PaginationMeta داخل SuccessMeta
     )
-    return ApiSuccessResponse(data=items, meta=meta)
+    return success_response(result.items, meta, headers=validators.headers())
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_brands(
+    name: Optional[str] = Query(None, description="Filter by brand name"),
+    country: Optional[str] = Query(None, description="Filter by brand country"),
+    fmt: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    filters = {"name": name, "country": country}
+    return export_response(brand_service.stream(filters), Brand, "brands", fmt, gzip)
 
 
 async def _ensure_logo_url_from_id(payload_dict: dict) -> dict:
@@ -55,6 +81,27 @@ async def _ensure_logo_url_from_id(payload_dict: dict) -> dict:
     return payload_dict
 
 
+async def _ensure_logo_urls(items: list, invalid: list) -> tuple[list, list]:
+    """
+    نسخه‌ی دسته‌ای _ensure_logo_url_from_id برای bulk: همه‌ی لوگوها با یک کوئری خوانده می‌شوند.
+    آخرین عضو هر آیتم payload است؛ آیتمی که لوگویش پیدا نشود invalid می‌شود.
+    """
+    files = await file_service.get_many(item[-1].logo_id for item in items)
+    valid = []
+    for item in items:
+        payload = item[-1]
+        data = payload.model_dump(exclude_unset=True)
+        data.pop("logo_url", None)  # از کلاینت قبول نمی‌کنیم
+        if "logo_id" in data:
+            logo_id = data["logo_id"]
+            if logo_id and logo_id not in files:
+                invalid.append(BulkItemResult(index=item[0], status="invalid", error="لوگو با این شناسه پیدا نشد"))
+                continue
+            data["logo_url"] = files[logo_id].url if logo_id else None
+        valid.append((*item[:-1], type(payload)(**data)))
+    return valid, invalid
+
+
 @router.post("", response_model=ApiSuccessResponse[Brand], status_code=201)
 async def create_brand(request: Request, payload: BrandCreate):
     data = payload.dict(exclude_unset=True)
@@ -69,14 +116,62 @@ async def create_brand(request: Request, payload: BrandCreate):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=created, meta=meta)
+    return success_response(created, meta, status_code=201)
 
 
+@router.post("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("BrandCreate"))
+async def bulk_create_brands(request: Request):
+    """Create many brands from a JSON array or NDJSON body; returns one result per item."""
+    items, invalid = parse_create_items(await read_bulk_items(request), BrandCreate)
+    items, invalid = await _ensure_logo_urls(items, invalid)
+    results = await brand_service.bulk_create(items)
+    meta = SuccessMeta(
+        message="brands.bulk_create.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.put("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("BrandUpdate", "update"))
+async def bulk_update_brands(request: Request):
+    """Patch many brands; each item is {"id": ..., <fields to change>}."""
+    items, invalid = parse_update_items(await read_bulk_items(request), BrandUpdate)
+    items, invalid = await _ensure_logo_urls(items, invalid)
+    results = await brand_service.bulk_update(items)
+    meta = SuccessMeta(
+        message="brands.bulk_update.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.post("/bulk/delete", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("Brand", "delete"))
+async def bulk_delete_brands(request: Request):
+    """Delete many brands by id (JSON array or NDJSON of ids)."""
+    items, invalid = parse_ids(await read_bulk_items(request))
+    results = await brand_service.bulk_delete(items)
+    meta = SuccessMeta(
+        message="brands.bulk_delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
 @router.get("/{brand_id}", response_model=ApiSuccessResponse[Brand])
-async def get_brand(request: Request, brand_id: UUID):
-    brand = await brand_service.get(brand_id)
+async def get_brand(
+    request: Request,
+    brand_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    brand = await brand_service.get(brand_id, fields=parse_fields(fields, Brand))
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
+    validators = entity_validators(brand, variant=request.url.query)
+    if validators.matches(request):
+        return validators.not_modified()
 
     meta = SuccessMeta(
         message="brands.get.success",
@@ -84,7 +179,7 @@ async def get_brand(request: Request, brand_id: UUID):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=brand, meta=meta)
+    return success_response(brand, meta, headers=validators.headers())
 
 
 @router.put("/{brand_id}", response_model=ApiSuccessResponse[Brand])
@@ -103,7 +198,7 @@ async def update_brand(request: Request, brand_id: UUID, payload: BrandUpdate):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=updated, meta=meta)
+    return success_response(updated, meta)
 
 
 @router.delete("/{brand_id}", response_model=ApiSuccessResponse[dict])
@@ -118,4 +213,4 @@ async def delete_brand(request: Request, brand_id: UUID):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data={"status": "deleted"}, meta=meta)
+    return success_response({"status": "deleted"}, meta)
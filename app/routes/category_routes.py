@@ -1,10 +1,17 @@
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from typing import List, Optional
 
 from app.models.category import Category, CategoryCreate, CategoryUpdate
 from app.services.category_service import category_service
-from app.models.response import ApiSuccessResponse, SuccessMeta, PaginationMeta
+from app.models.response import ApiSuccessResponse, SuccessMeta
+from app.models.bulk import BulkResult
+from app.services.fields import parse_fields
+from app.web.conditional import entity_validators, list_validators
+from app.web.responses import success_response
+from app.web.bulk import bulk_openapi, parse_create_items, parse_ids, parse_update_items, read_bulk_items
+from app.web.streaming import ExportFormat, export_response
 
 router = APIRouter()
 
@@ -15,16 +22,24 @@ async def list_categories(
     parent_id: Optional[UUID] = Query(None, description="Filter by parent category"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.pagination.next_cursor (replaces page)"),
+    include_total: bool = Query(True, description="Count matching documents; disable for faster deep listings"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
 ):
+    selected = parse_fields(fields, Category)
+    validators = await list_validators(request, "categories")
+    if validators.matches(request):
+        return validators.not_modified()
+
     filters = {}
     if name:
         filters["name"] = name
     if parent_id:
         filters["parent_id"] = parent_id
 
-    items, total = await category_service.list(filters, page, limit)
+    result = await category_service.list(filters, page, limit, cursor, include_total, fields=selected)
 
-    pagination = PaginationMeta(page=page, limit=limit, total=total)
+    pagination = result.meta(page, limit, cursor)
     meta = SuccessMeta(
         message="categories.list.success",
         method=request.method,
@@ -32,13 +47,69 @@ async def list_categories(
         host=request.client.host if request.client else None,
         pagination=pagination,
     )
-    return ApiSuccessResponse(data=items, meta=meta)
+    return success_response(result.items, meta, headers=validators.headers())
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_categories(
+    name: Optional[str] = Query(None, description="Filter by category name"),
+    parent_id: Optional[UUID] = Query(None, description="Filter by parent category"),
+    fmt: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    filters = {"name": name, "parent_id": parent_id}
+    return export_response(category_service.stream(filters), Category, "categories", fmt, gzip)
+
+@router.post("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("CategoryCreate"))
+async def bulk_create_categories(request: Request):
+    """Create many categories from a JSON array or NDJSON body; returns one result per item."""
+    items, invalid = parse_create_items(await read_bulk_items(request), CategoryCreate)
+    results = await category_service.bulk_create(items)
+    meta = SuccessMeta(
+        message="categories.bulk_create.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.put("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("CategoryUpdate", "update"))
+async def bulk_update_categories(request: Request):
+    """Patch many categories; each item is {"id": ..., <fields to change>}."""
+    items, invalid = parse_update_items(await read_bulk_items(request), CategoryUpdate)
+    results = await category_service.bulk_update(items)
+    meta = SuccessMeta(
+        message="categories.bulk_update.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.post("/bulk/delete", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("Category", "delete"))
+async def bulk_delete_categories(request: Request):
+    """Delete many categories by id (JSON array or NDJSON of ids)."""
+    items, invalid = parse_ids(await read_bulk_items(request))
+    results = await category_service.bulk_delete(items)
+    meta = SuccessMeta(
+        message="categories.bulk_delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
 
 @router.get("/{category_id}", response_model=ApiSuccessResponse[Category])
-async def get_category(request: Request, category_id: UUID):
-    category = await category_service.get(category_id)
+async def get_category(
+    request: Request,
+    category_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    category = await category_service.get(category_id, fields=parse_fields(fields, Category))
     if not category:
         raise HTTPException(404, "Category not found")
+    validators = entity_validators(category, variant=request.url.query)
+    if validators.matches(request):
+        return validators.not_modified()
 
     meta = SuccessMeta(
         message="categories.get.success",
@@ -46,7 +117,7 @@ async def get_category(request: Request, category_id: UUID):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=category, meta=meta)
+    return success_response(category, meta, headers=validators.headers())
 
 @router.post("/", response_model=ApiSuccessResponse[Category], status_code=201)
 async def create_category(request: Request, payload: CategoryCreate):
@@ -57,7 +128,7 @@ async def create_category(request: Request, payload: CategoryCreate):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=created, meta=meta)
+    return success_response(created, meta, status_code=201)
 
 
 @router.put("/{category_id}", response_model=ApiSuccessResponse[Category])
@@ -72,7 +143,7 @@ async def update_category(request: Request, category_id: UUID, payload: Category
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=category, meta=meta)
+    return success_response(category, meta)
 
 
 @router.delete("/{category_id}", response_model=ApiSuccessResponse[dict])
@@ -87,4 +158,4 @@ async def delete_category(request: Request, category_id: UUID):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data={"status": "deleted"}, meta=meta)
+    return success_response({"status": "deleted"}, meta)
@@ -1,43 +1,138 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from typing import List, Optional
 
-from app.models.product import ProductResponse, ProductCreate, ProductUpdate
-from app.models.response import ApiSuccessResponse, SuccessMeta, PaginationMeta
-from app.services.product_service import product_service   # ✅ فقط این
+from app.models.product import Product, ProductResponse, ProductCreate, ProductUpdate
+from app.models.response import ApiSuccessResponse, SuccessMeta
+from app.services.product_service import EXPANDABLE, expanded_model, product_service, related_collections   # ✅ فقط این
+from app.services.versions import collection_versions
+from app.models.bulk import BulkResult
+from app.services.fields import parse_expand, parse_fields
+from app.web.conditional import entity_validators, list_validators
+from app.web.responses import success_response
+from app.web.bulk import bulk_openapi, parse_create_items, parse_ids, parse_update_items, read_bulk_items
+from app.web.streaming import ExportFormat, export_response
 
 router = APIRouter()
 
 @router.get("", response_model=ApiSuccessResponse[List[ProductResponse]])
 async def list_products(
     request: Request,
-    search: Optional[str] = Query(None, description="Search in name, description, tags"),
+    search: Optional[str] = Query(None, description="Full-text search in name, full name, description and tags (ranked by relevance unless sorted by price)"),
     sort_by_price: Optional[str] = Query(None, description="Sort by price: 'asc' or 'desc'"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.pagination.next_cursor (replaces page)"),
+    include_total: bool = Query(True, description="Count matching documents; disable for faster deep listings"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included); relations are only populated when listed"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to populate (store, category, brand, images, warehouse_availability) or 'none' for raw ids; all by default"),
 ):
-    items, total = await product_service.list(search=search, sort_by_price=sort_by_price, page=page, limit=limit)
+    relations = parse_expand(expand, EXPANDABLE)
+    selected = parse_fields(fields, expanded_model(relations))
+    validators = await list_validators(request, "products", *related_collections(relations))
+    if validators.matches(request):
+        return validators.not_modified()
+
+    result = await product_service.list(
+        search=search,
+        sort_by_price=sort_by_price,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        fields=selected,
+        expand=relations,
+    )
     meta = SuccessMeta(
         message="products.list.success",
         method=request.method,
         path=request.url.path,
         host=request.client.host if request.client else None,
-        pagination=PaginationMeta(page=page, limit=limit, total=total),
+        pagination=result.meta(page, limit, cursor),
+    )
+    return success_response(result.items, meta, headers=validators.headers())
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_products(
+    brand_id: Optional[UUID] = Query(None, description="Filter by brand"),
+    category_id: Optional[UUID] = Query(None, description="Filter by category"),
+    store_id: Optional[UUID] = Query(None, description="Filter by store"),
+    fmt: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    """Raw product documents (relations as ids, not populated)."""
+    filters = {"brand_id": brand_id, "category_id": category_id, "store_id": store_id}
+    return export_response(product_service.stream(filters), Product, "products", fmt, gzip)
+
+@router.post("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("ProductCreate"))
+async def bulk_create_products(request: Request):
+    """Create many products from a JSON array or NDJSON body; returns one result per item."""
+    items, invalid = parse_create_items(await read_bulk_items(request), ProductCreate)
+    results = await product_service.bulk_create(items)
+    meta = SuccessMeta(
+        message="products.bulk_create.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=items, meta=meta)
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.put("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("ProductUpdate", "update"))
+async def bulk_update_products(request: Request):
+    """Patch many products; each item is {"id": ..., <fields to change>}."""
+    items, invalid = parse_update_items(await read_bulk_items(request), ProductUpdate)
+    results = await product_service.bulk_update(items)
+    meta = SuccessMeta(
+        message="products.bulk_update.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.post("/bulk/delete", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("Product", "delete"))
+async def bulk_delete_products(request: Request):
+    """Delete many products by id (JSON array or NDJSON of ids)."""
+    items, invalid = parse_ids(await read_bulk_items(request))
+    results = await product_service.bulk_delete(items)
+    meta = SuccessMeta(
+        message="products.bulk_delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
 
 @router.get("/{product_id}", response_model=ApiSuccessResponse[ProductResponse])
-async def get_product(request: Request, product_id: UUID):
-    product = await product_service.get(product_id)
+async def get_product(
+    request: Request,
+    product_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included); relations are only populated when listed"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to populate (store, category, brand, images, warehouse_availability) or 'none' for raw ids; all by default"),
+):
+    relations = parse_expand(expand, EXPANDABLE)
+    selected = parse_fields(fields, expanded_model(relations))
+    # اعتبارسنجی قبل از populate؛ پاسخ 304 هیچ کوئری مرجعی اجرا نمی‌کند
+    product, related = await asyncio.gather(
+        product_service.get(product_id, populate=False, fields=selected),
+        collection_versions.get(related_collections(relations)),
+    )
     if not product:
         raise HTTPException(404, "Product not found")
+    validators = entity_validators(product, related, variant=request.url.query)
+    if validators.matches(request):
+        return validators.not_modified()
+
+    product = (await product_service.populate([product], selected, relations))[0]
     meta = SuccessMeta(
         message="products.get.success",
         method=request.method,
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=product, meta=meta)
+    return success_response(product, meta, headers=validators.headers())
 
 @router.post("", response_model=ApiSuccessResponse[ProductResponse], status_code=201)
 async def create_product(request: Request, payload: ProductCreate):
@@ -49,7 +144,7 @@ async def create_product(request: Request, payload: ProductCreate):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=product, meta=meta)
+    return success_response(product, meta, status_code=201)
 
 @router.put("/{product_id}", response_model=ApiSuccessResponse[ProductResponse])
 async def update_product(request: Request, product_id: UUID, payload: ProductUpdate):
@@ -63,7 +158,7 @@ async def update_product(request: Request, product_id: UUID, payload: ProductUpd
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=product, meta=meta)
+    return success_response(product, meta)
 
 @router.delete("/{product_id}", response_model=ApiSuccessResponse[dict])
 async def delete_product(request: Request, product_id: UUID):
@@ -76,4 +171,4 @@ async def delete_product(request: Request, product_id: UUID):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data={"status": "deleted"}, meta=meta)
+    return success_response({"status": "deleted"}, meta)
@@ -1,62 +1,155 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from uuid import UUID
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.models.store import Store, StoreCreate, StoreUpdate
+from app.models.response import ApiSuccessResponse, SuccessMeta
 from app.services.store_service import store_service
+from app.models.bulk import BulkResult
+from app.services.fields import parse_fields
+from app.web.conditional import entity_validators, list_validators
+from app.web.responses import success_response
+from app.web.bulk import bulk_openapi, parse_create_items, parse_ids, parse_update_items, read_bulk_items
+from app.web.streaming import ExportFormat, export_response
 
 router = APIRouter()
 
-@router.get('/', response_model=List[Store])
+@router.get('/', response_model=ApiSuccessResponse[List[Store]])
 async def list_stores(
+    request: Request,
     search: Optional[str] = Query(None, description="Search stores by name, address or phone"),
-    sort_by: Optional[str] = Query(None, description="Sort by 'name' or 'created_at' (asc/desc)")
+    sort_by: Optional[Literal["name", "name_desc", "created_at", "created_at_desc"]] = Query(
+        None, description="Sort by 'name' or 'created_at' (asc/desc); relevance when searching"
+    ),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.pagination.next_cursor (replaces page)"),
+    include_total: bool = Query(True, description="Count matching documents; disable for faster deep listings"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
 ):
-    stores = await store_service.list()
-
-    # فیلتر با search
-    if search:
-        stores = [
-            s for s in stores
-            if search.lower() in s.name.lower()
-            or (s.address and search.lower() in s.address.lower())
-            or (s.phone and search.lower() in s.phone.lower())
-        ]
-
-    # مرتب‌سازی
-    if sort_by:
-        if sort_by == "name":
-            stores = sorted(stores, key=lambda s: s.name)
-        elif sort_by == "name_desc":
-            stores = sorted(stores, key=lambda s: s.name, reverse=True)
-        elif sort_by == "created_at":
-            stores = sorted(stores, key=lambda s: s.created_at)
-        elif sort_by == "created_at_desc":
-            stores = sorted(stores, key=lambda s: s.created_at, reverse=True)
-
-    return stores
-
-@router.get('/{store_id}', response_model=Store)
-async def get_store(store_id: UUID):
-    store = await store_service.get(store_id)
+    selected = parse_fields(fields, Store)
+    validators = await list_validators(request, "stores")
+    if validators.matches(request):
+        return validators.not_modified()
+
+    result = await store_service.list(
+        search=search,
+        sort_by=sort_by,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        fields=selected,
+    )
+    meta = SuccessMeta(
+        message="stores.list.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+        pagination=result.meta(page, limit, cursor),
+    )
+    return success_response(result.items, meta, headers=validators.headers())
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_stores(
+    fmt: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    return export_response(store_service.stream(), Store, "stores", fmt, gzip)
+
+@router.post('/bulk', response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("StoreCreate"))
+async def bulk_create_stores(request: Request):
+    """Create many stores from a JSON array or NDJSON body; returns one result per item."""
+    items, invalid = parse_create_items(await read_bulk_items(request), StoreCreate)
+    results = await store_service.bulk_create(items)
+    meta = SuccessMeta(
+        message="stores.bulk_create.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.put('/bulk', response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("StoreUpdate", "update"))
+async def bulk_update_stores(request: Request):
+    """Patch many stores; each item is {"id": ..., <fields to change>}."""
+    items, invalid = parse_update_items(await read_bulk_items(request), StoreUpdate)
+    results = await store_service.bulk_update(items)
+    meta = SuccessMeta(
+        message="stores.bulk_update.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.post('/bulk/delete', response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("Store", "delete"))
+async def bulk_delete_stores(request: Request):
+    """Delete many stores by id (JSON array or NDJSON of ids)."""
+    items, invalid = parse_ids(await read_bulk_items(request))
+    results = await store_service.bulk_delete(items)
+    meta = SuccessMeta(
+        message="stores.bulk_delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.get('/{store_id}', response_model=ApiSuccessResponse[Store])
+async def get_store(
+    request: Request,
+    store_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    store = await store_service.get(store_id, fields=parse_fields(fields, Store))
     if not store:
         raise HTTPException(404, 'Store not found')
-    return store
+    validators = entity_validators(store, variant=request.url.query)
+    if validators.matches(request):
+        return validators.not_modified()
+    meta = SuccessMeta(
+        message="stores.get.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(store, meta, headers=validators.headers())
 
-@router.post('/', response_model=Store)
-async def create_store(payload: StoreCreate):
-    return await store_service.create(payload)
+@router.post('/', response_model=ApiSuccessResponse[Store], status_code=201)
+async def create_store(request: Request, payload: StoreCreate):
+    created = await store_service.create(payload)
+    meta = SuccessMeta(
+        message="stores.create.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(created, meta, status_code=201)
 
-@router.put('/{store_id}', response_model=Store)
-async def update_store(store_id: UUID, payload: StoreUpdate):
+@router.put('/{store_id}', response_model=ApiSuccessResponse[Store])
+async def update_store(request: Request, store_id: UUID, payload: StoreUpdate):
     store = await store_service.update(store_id, payload)
     if not store:
         raise HTTPException(404, 'Store not found')
-    return store
+    meta = SuccessMeta(
+        message="stores.update.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(store, meta)
 
-@router.delete('/{store_id}')
-async def delete_store(store_id: UUID):
+@router.delete('/{store_id}', response_model=ApiSuccessResponse[dict])
+async def delete_store(request: Request, store_id: UUID):
     success = await store_service.delete(store_id)
     if not success:
         raise HTTPException(404, 'Store not found')
-    return {'status': 'deleted'}
+    meta = SuccessMeta(
+        message="stores.delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response({'status': 'deleted'}, meta)
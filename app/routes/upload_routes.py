@@ -1,45 +1,54 @@
-import uuid
 from pathlib import Path
-import shutil
 from typing import List
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
+from app.config import get_settings
+from app.models.response import ApiSuccessResponse, SuccessMeta
 from app.services.file_service import file_service
-from app.models.file import File as FileModel, FileCreate
+from app.models.file import File as FileModel
+from app.web.responses import success_response
+from app.web.uploads import UploadReceiver, upload_openapi
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+settings = get_settings()
+UPLOAD_DIR = Path(settings.upload_dir)
+# فایل‌ها اینجا نوشته می‌شوند تا هششان معلوم شود، بعد به ab/cd/<sha256>.<ext> منتقل می‌شوند؛
+# بیرون از UPLOAD_DIR تا فایل نیمه‌کاره از /static در دسترس نباشد
+INCOMING_DIR = Path(settings.upload_incoming_dir or f"{UPLOAD_DIR}.incoming")
+INCOMING_DIR.mkdir(parents=True, exist_ok=True)
 
 ALLOWED_EXT = {"jpg", "jpeg", "png", "gif", "webp"}
 
 class UploadResponse(BaseModel):
     files: List[FileModel]
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload(files: List[UploadFile] = File(...)):
-    results = []
-    for upload in files:
-        filename = Path(upload.filename).name
-        ext = filename.split(".")[-1].lower()
-        if ext not in ALLOWED_EXT:
-            raise HTTPException(status_code=400, detail=f"فرمت فایل پشتیبانی نمی‌شود: {filename}")
+@router.post("/upload", response_model=UploadResponse, openapi_extra=upload_openapi("files"))
+async def upload(request: Request):
+    # بدنه مستقیم روی دیسک استریم می‌شود؛ فایل موقت و کپی دوم در کار نیست
+    receiver = UploadReceiver(INCOMING_DIR, ALLOWED_EXT, settings.upload_max_file_size, settings.upload_max_files)
+    stored = await receiver.receive(request)
+    if not stored:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    try:
+        files = await file_service.store_uploads(stored)
+    except Exception as e:
+        await receiver.discard()
+        raise HTTPException(status_code=500, detail=f"خطا در ذخیره فایل: {str(e)}")
 
-        unique_filename = f"{uuid.uuid4()}.{ext}"
-        dest = UPLOAD_DIR / unique_filename
-        try:
-            with dest.open("wb") as buffer:
-                shutil.copyfileobj(upload.file, buffer)
-            file_data = FileCreate(
-                url=f"/static/{unique_filename}",
-                filename=filename,
-                content_type=upload.content_type,
-                size=upload.size
-            )
-            created = await file_service.create(file_data)
-            results.append(created)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"خطا در ذخیره فایل: {str(e)}")
+    return {"files": files}
 
-    return {"files": results}
\ No newline at end of file
+@router.delete("/{file_id}", response_model=ApiSuccessResponse[dict])
+async def delete_file(request: Request, file_id: UUID):
+    # فایل روی دیسک فقط با حذف آخرین رکوردی که به آن اشاره دارد پاک می‌شود
+    success = await file_service.delete(file_id)
+    if not success:
+        raise HTTPException(404, "File not found")
+    meta = SuccessMeta(
+        message="files.delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response({"status": "deleted"}, meta)
@@ -1,24 +1,118 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from uuid import UUID
 
 from app.models.user import User, UserCreate, UserUpdate
+from app.models.response import ApiSuccessResponse, SuccessMeta
 from app.services.user_service import user_service
+from app.models.bulk import BulkResult
+from app.services.fields import parse_fields
+from app.web.conditional import entity_validators, list_validators
+from app.web.responses import FastJSONResponse, success_response
+from app.web.bulk import bulk_openapi, parse_create_items, parse_ids, parse_update_items, read_bulk_items
+from app.web.streaming import ExportFormat, export_response
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[User])
-async def list_users():
-    return await user_service.list()
+@router.get("/", response_model=ApiSuccessResponse[List[User]])
+async def list_users(
+    request: Request,
+    role: Optional[str] = Query(None, description="Filter by role"),
+    is_active: Optional[bool] = Query(None, description="Filter by active flag"),
+    username: Optional[str] = Query(None, description="Filter by username prefix"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.pagination.next_cursor (replaces page)"),
+    include_total: bool = Query(True, description="Count matching documents; disable for faster deep listings"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    selected = parse_fields(fields, User)
+    validators = await list_validators(request, "users")
+    if validators.matches(request):
+        return validators.not_modified()
+
+    filters = user_service.build_filters(role, is_active, username)
+    result = await user_service.list(filters, page, limit, cursor, include_total, fields=selected)
+    meta = SuccessMeta(
+        message="users.list.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+        pagination=result.meta(page, limit, cursor),
+    )
+    return success_response(result.items, meta, headers=validators.headers())
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    role: Optional[str] = Query(None, description="Filter by role"),
+    is_active: Optional[bool] = Query(None, description="Filter by active flag"),
+    username: Optional[str] = Query(None, description="Filter by username prefix"),
+    fmt: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    filters = user_service.build_filters(role, is_active, username)
+    return export_response(user_service.stream(filters), User, "users", fmt, gzip)
+
+
+@router.post("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("UserCreate"))
+async def bulk_create_users(request: Request):
+    """Create many users from a JSON array or NDJSON body; returns one result per item."""
+    items, invalid = parse_create_items(await read_bulk_items(request), UserCreate)
+    results = await user_service.bulk_create(items)
+    meta = SuccessMeta(
+        message="users.bulk_create.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+
+@router.put("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("UserUpdate", "update"))
+async def bulk_update_users(request: Request):
+    """Patch many users; each item is {"id": ..., <fields to change>}."""
+    items, invalid = parse_update_items(await read_bulk_items(request), UserUpdate)
+    results = await user_service.bulk_update(items)
+    meta = SuccessMeta(
+        message="users.bulk_update.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+
+@router.post("/bulk/delete", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("User", "delete"))
+async def bulk_delete_users(request: Request):
+    """Delete many users by id (JSON array or NDJSON of ids)."""
+    items, invalid = parse_ids(await read_bulk_items(request))
+    results = await user_service.bulk_delete(items)
+    meta = SuccessMeta(
+        message="users.bulk_delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
 
 
 @router.get("/{user_id}", response_model=User)
-async def get_user(user_id: UUID):
-    user = await user_service.get(user_id)
+async def get_user(
+    request: Request,
+    user_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    user = await user_service.get(user_id, fields=parse_fields(fields, User))
     if not user:
         raise HTTPException(404, "User not found")
-    return user
+    validators = entity_validators(user, variant=request.url.query)
+    if validators.matches(request):
+        return validators.not_modified()
+    # تک‌کاربر بدون envelope، مثل قبل؛ Response مستقیم تا هدرهای ETag هم برسند
+    return FastJSONResponse(user, headers=validators.headers())
 
 
 @router.post("/", response_model=User)
@@ -1,10 +1,17 @@
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from typing import Optional, List
 
 from app.models.warehouse import Warehouse, WarehouseCreate, WarehouseUpdate
-from app.models.response import ApiSuccessResponse, SuccessMeta, PaginationMeta
+from app.models.response import ApiSuccessResponse, SuccessMeta
 from app.services.warehouse_service import warehouse_service
+from app.models.bulk import BulkResult
+from app.services.fields import parse_fields
+from app.web.conditional import entity_validators, list_validators
+from app.web.responses import success_response
+from app.web.bulk import bulk_openapi, parse_create_items, parse_ids, parse_update_items, read_bulk_items
+from app.web.streaming import ExportFormat, export_response
 
 router = APIRouter()
 
@@ -15,16 +22,24 @@ async def list_warehouses(
     location: Optional[str] = Query(None, description="Filter by location"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.pagination.next_cursor (replaces page)"),
+    include_total: bool = Query(True, description="Count matching documents; disable for faster deep listings"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
 ):
+    selected = parse_fields(fields, Warehouse)
+    validators = await list_validators(request, "warehouses")
+    if validators.matches(request):
+        return validators.not_modified()
+
     filters = {}
     if name:
         filters["name"] = name
     if location:
         filters["location"] = location
 
-    items, total = await warehouse_service.list(filters, page, limit)
+    result = await warehouse_service.list(filters, page, limit, cursor, include_total, fields=selected)
 
-    pagination = PaginationMeta(page=page, limit=limit, total=total)
+    pagination = result.meta(page, limit, cursor)
     meta = SuccessMeta(
         message="warehouses.list.success",
         method=request.method,
@@ -32,7 +47,17 @@ async def list_warehouses(
         host=request.client.host if request.client else None,
         pagination=pagination,
     )
-    return ApiSuccessResponse(data=items, meta=meta)
+    return success_response(result.items, meta, headers=validators.headers())
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_warehouses(
+    name: Optional[str] = Query(None, description="Filter by warehouse name"),
+    location: Optional[str] = Query(None, description="Filter by location"),
+    fmt: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    filters = {"name": name, "location": location}
+    return export_response(warehouse_service.stream(filters), Warehouse, "warehouses", fmt, gzip)
 
 @router.post("", response_model=ApiSuccessResponse[Warehouse], status_code=201)
 async def create_warehouse(request: Request, payload: WarehouseCreate):
@@ -43,20 +68,66 @@ async def create_warehouse(request: Request, payload: WarehouseCreate):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=created, meta=meta)
+    return success_response(created, meta, status_code=201)
+
+@router.post("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("WarehouseCreate"))
+async def bulk_create_warehouses(request: Request):
+    """Create many warehouses from a JSON array or NDJSON body; returns one result per item."""
+    items, invalid = parse_create_items(await read_bulk_items(request), WarehouseCreate)
+    results = await warehouse_service.bulk_create(items)
+    meta = SuccessMeta(
+        message="warehouses.bulk_create.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.put("/bulk", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("WarehouseUpdate", "update"))
+async def bulk_update_warehouses(request: Request):
+    """Patch many warehouses; each item is {"id": ..., <fields to change>}."""
+    items, invalid = parse_update_items(await read_bulk_items(request), WarehouseUpdate)
+    results = await warehouse_service.bulk_update(items)
+    meta = SuccessMeta(
+        message="warehouses.bulk_update.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
+
+@router.post("/bulk/delete", response_model=ApiSuccessResponse[BulkResult], openapi_extra=bulk_openapi("Warehouse", "delete"))
+async def bulk_delete_warehouses(request: Request):
+    """Delete many warehouses by id (JSON array or NDJSON of ids)."""
+    items, invalid = parse_ids(await read_bulk_items(request))
+    results = await warehouse_service.bulk_delete(items)
+    meta = SuccessMeta(
+        message="warehouses.bulk_delete.success",
+        method=request.method,
+        path=request.url.path,
+        host=request.client.host if request.client else None,
+    )
+    return success_response(BulkResult.from_items(invalid + results), meta)
 
 @router.get("/{warehouse_id}", response_model=ApiSuccessResponse[Warehouse])
-async def get_warehouse(request: Request, warehouse_id: UUID):
-    warehouse = await warehouse_service.get(warehouse_id)
+async def get_warehouse(
+    request: Request,
+    warehouse_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    warehouse = await warehouse_service.get(warehouse_id, fields=parse_fields(fields, Warehouse))
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
+    validators = entity_validators(warehouse, variant=request.url.query)
+    if validators.matches(request):
+        return validators.not_modified()
     meta = SuccessMeta(
         message="warehouses.get.success",
         method=request.method,
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=warehouse, meta=meta)
+    return success_response(warehouse, meta, headers=validators.headers())
 
 @router.put("/{warehouse_id}", response_model=ApiSuccessResponse[Warehouse])
 async def update_warehouse(request: Request, warehouse_id: UUID, payload: WarehouseUpdate):
@@ -69,7 +140,7 @@ async def update_warehouse(request: Request, warehouse_id: UUID, payload: Wareho
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data=updated, meta=meta)
+    return success_response(updated, meta)
 
 @router.delete("/{warehouse_id}", response_model=ApiSuccessResponse[dict])
 async def delete_warehouse(request: Request, warehouse_id: UUID):
@@ -82,4 +153,4 @@ async def delete_warehouse(request: Request, warehouse_id: UUID):
         path=request.url.path,
         host=request.client.host if request.client else None,
     )
-    return ApiSuccessResponse(data={"status": "deleted"}, meta=meta)
+    return success_response({"status": "deleted"}, meta)
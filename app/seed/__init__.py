@@ -0,0 +1,10 @@
+"""
+Deterministic fake data for every collection, from a few hundred documents for
+local development up to millions of products for load tests.
+
+    python -m app.seed --products 1000000 --workers 8
+"""
+from app.seed.generators import SeedPlan
+from app.seed.runner import SeedReport, seed
+
+__all__ = ["SeedPlan", "SeedReport", "seed"]
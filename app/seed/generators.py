@@ -0,0 +1,304 @@
+"""
+Deterministic document generators. Every document is a pure function of
+``(seed, collection, index)``: ids are derived rather than stored, so any
+worker can build product ``i`` and point it at brand ``j`` without reading
+the database, and the same seed always yields the same dataset.
+"""
+import random
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple
+
+from faker import Faker
+
+NAMESPACE = uuid.UUID("6f0b8a52-3c1e-4c0e-9d8a-5e2f7c1b9a40")
+
+# بازه‌ی زمانی created_at سندهای ساختگی
+EPOCH = datetime(2024, 1, 1)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+# عدد ثابت هر کالکشن برای seed کردن Random هر سند
+_SALTS = {"brands": 1, "categories": 2, "warehouses": 3, "stores": 4, "users": 5, "files": 6, "products": 7}
+
+ROLES = ["admin", "warehouse", "store", "sales", "viewer"]
+UNITS = ["piece", "box", "pack", "bottle", "bag", "carton"]
+PACKAGING = ["carton", "plastic", "glass", "can", "paper", "shrink wrap"]
+STORAGE = ["dry", "chilled", "frozen", "ambient"]
+CERTIFICATIONS = ["ISO 22000", "HACCP", "Organic", "Fair Trade", "Non-GMO", "Kosher"]
+BARCODE_TYPES = ["EAN13", "UPC", "EAN8"]
+CURRENCIES = ["USD", "EUR", "IRR"]
+
+
+@dataclass(frozen=True)
+class SeedPlan:
+    """How many documents to generate per collection."""
+
+    brands: int = 10
+    categories: int = 10
+    warehouses: int = 5
+    stores: int = 5
+    users: int = 20
+    files: int = 20
+    products: int = 100
+
+    @classmethod
+    def scaled(cls, products: int) -> "SeedPlan":
+        """A plan for ``products`` products with the other collections in realistic proportion."""
+        return cls(
+            brands=max(10, products // 200),
+            categories=max(10, products // 500),
+            warehouses=max(5, products // 5000),
+            stores=max(5, products // 1000),
+            users=max(20, products // 100),
+            files=max(20, products // 20),
+            products=products,
+        )
+
+    def counts(self) -> Dict[str, int]:
+        # ترتیب فیلدها = ترتیب درج؛ کالکشن‌های کوچک و مرجع اول
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+class Pools(NamedTuple):
+    companies: List[str]
+    first_names: List[str]
+    last_names: List[str]
+    cities: List[str]
+    addresses: List[str]
+    phones: List[str]
+    countries: List[str]
+    words: List[str]
+    sentences: List[str]
+    paragraphs: List[str]
+
+
+@lru_cache(maxsize=8)
+def pools(seed: int) -> Pools:
+    """
+    Faker output sampled once per process and seed. Calling Faker per field
+    costs tens of microseconds; picking from these pools keeps generation
+    cheap at millions of documents while staying realistic.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    return Pools(
+        companies=[fake.company() for _ in range(500)],
+        first_names=[fake.first_name() for _ in range(300)],
+        last_names=[fake.last_name() for _ in range(300)],
+        cities=[fake.city() for _ in range(200)],
+        addresses=[fake.address().replace("\n", ", ") for _ in range(500)],
+        phones=[fake.phone_number() for _ in range(500)],
+        countries=[fake.country_code() for _ in range(60)],
+        words=[fake.word() for _ in range(2000)],
+        sentences=[fake.sentence(nb_words=8) for _ in range(500)],
+        paragraphs=[fake.paragraph(nb_sentences=4) for _ in range(200)],
+    )
+
+
+@lru_cache(maxsize=64)
+def _id_base(seed: int, collection: str) -> int:
+    # ۶۴ بیت بالا ثابتِ (seed, collection)، ۶۴ بیت پایین شماره‌ی سند
+    return uuid.uuid5(NAMESPACE, f"{seed}:{collection}").int & ~((1 << 64) - 1)
+
+
+def entity_id(seed: int, collection: str, index: int) -> uuid.UUID:
+    return uuid.UUID(int=_id_base(seed, collection) | index, version=4)
+
+
+def _rng(seed: int, collection: str, index: int) -> random.Random:
+    return random.Random((seed << 72) | (_SALTS[collection] << 64) | index)
+
+
+def _stamp(rng: random.Random) -> datetime:
+    # دقت میلی‌ثانیه، مثل BSON
+    return EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS), milliseconds=rng.randrange(1000))
+
+
+def file_url(seed: int, index: int) -> str:
+    return f"https://picsum.photos/seed/{seed}-{index}/640/480"
+
+
+def brand(seed: int, i: int, plan: SeedPlan) -> dict:
+    rng, p = _rng(seed, "brands", i), pools(seed)
+    name = rng.choice(p.companies)
+    logo = rng.randrange(plan.files)
+    now = _stamp(rng)
+    return {
+        "_id": entity_id(seed, "brands", i),
+        "name": name,
+        "description": rng.choice(p.sentences),
+        "country": rng.choice(p.countries),
+        "website": f"https://{rng.choice(p.words)}{i}.example.com",
+        "logo_id": entity_id(seed, "files", logo),
+        "logo_url": file_url(seed, logo),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def category(seed: int, i: int, plan: SeedPlan) -> dict:
+    rng, p = _rng(seed, "categories", i), pools(seed)
+    # حدود یک‌دهم ریشه‌اند؛ بقیه زیر یک دسته‌ی قبلی، پس درخت بدون حلقه است
+    roots = max(1, plan.categories // 10)
+    parent = None if i < roots else entity_id(seed, "categories", rng.randrange(i))
+    now = _stamp(rng)
+    return {
+        "_id": entity_id(seed, "categories", i),
+        "name": f"{rng.choice(p.words).title()} {rng.choice(p.words)}",
+        "description": rng.choice(p.sentences),
+        "parent_id": parent,
+        "image_url": f"https://picsum.photos/seed/{seed}-category-{i}/320/240",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def warehouse(seed: int, i: int, plan: SeedPlan) -> dict:
+    rng, p = _rng(seed, "warehouses", i), pools(seed)
+    city = rng.choice(p.cities)
+    now = _stamp(rng)
+    return {
+        "_id": entity_id(seed, "warehouses", i),
+        "name": f"{city} Warehouse {i + 1}",
+        "location": rng.choice(p.addresses),
+        "capacity": rng.randrange(1_000, 200_000, 500),
+        "manager_id": entity_id(seed, "users", rng.randrange(plan.users)),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def store(seed: int, i: int, plan: SeedPlan) -> dict:
+    rng, p = _rng(seed, "stores", i), pools(seed)
+    warehouses = rng.sample(range(plan.warehouses), min(plan.warehouses, rng.randint(1, 3)))
+    now = _stamp(rng)
+    return {
+        "_id": entity_id(seed, "stores", i),
+        "name": f"{rng.choice(p.companies)} Market",
+        "description": rng.choice(p.sentences),
+        "address": rng.choice(p.addresses),
+        "phone": rng.choice(p.phones),
+        "owner_id": entity_id(seed, "users", rng.randrange(plan.users)),
+        "warehouse_ids": [entity_id(seed, "warehouses", w) for w in warehouses],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def user(seed: int, i: int, plan: SeedPlan) -> dict:
+    rng, p = _rng(seed, "users", i), pools(seed)
+    first, last = rng.choice(p.first_names), rng.choice(p.last_names)
+    # شماره‌ی سند یکتا بودن username و email را تضمین می‌کند
+    username = f"{first}.{last}.{i}".lower()
+    now = _stamp(rng)
+    return {
+        "_id": entity_id(seed, "users", i),
+        "username": username,
+        "email": f"{username}@example.com",
+        "full_name": f"{first} {last}",
+        "roles": rng.sample(ROLES, rng.randint(1, 2)),
+        "is_active": rng.random() < 0.95,
+        "password": "seed-password",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def file(seed: int, i: int, plan: SeedPlan) -> dict:
+    rng = _rng(seed, "files", i)
+    return {
+        "_id": entity_id(seed, "files", i),
+        "url": file_url(seed, i),
+        "filename": f"{seed}-{i}.jpg",
+        "content_type": "image/jpeg",
+        "size": rng.randrange(20_000, 400_000),
+        "created_at": _stamp(rng),
+    }
+
+
+def product(seed: int, i: int, plan: SeedPlan) -> dict:
+    rng, p = _rng(seed, "products", i), pools(seed)
+    pid = entity_id(seed, "products", i)
+    name = f"{rng.choice(p.words).title()} {rng.choice(p.words)}"
+    price = round(rng.uniform(0.5, 500), 2)
+    currency = rng.choice(CURRENCIES)
+    pack = rng.choice((1, 4, 6, 12))
+    warehouses = rng.sample(range(plan.warehouses), min(plan.warehouses, rng.randint(1, 3)))
+    now = _stamp(rng)
+    return {
+        "_id": pid,
+        "sku": f"SKU-{seed}-{i:08d}",
+        "name": name,
+        "full_name": f"{name} {rng.choice(p.words)} {pack}-pack",
+        "description": rng.choice(p.paragraphs),
+        "brand_id": entity_id(seed, "brands", rng.randrange(plan.brands)),
+        "category_id": entity_id(seed, "categories", rng.randrange(plan.categories)),
+        "store_id": entity_id(seed, "stores", rng.randrange(plan.stores)),
+        "price": price,
+        "wholesale_price": round(price * rng.uniform(0.7, 0.9), 2),
+        "purchase_price": round(price * rng.uniform(0.5, 0.7), 2),
+        "currency": currency,
+        "tax_rate": rng.choice((0.0, 0.05, 0.09, 0.2)),
+        "pricing_tiers": [
+            {"min_qty": q, "unit_price": round(price * (1 - d), 2), "currency": currency}
+            for q, d in ((10, 0.05), (50, 0.1), (100, 0.15))
+        ],
+        "unit_of_sale": rng.choice(UNITS),
+        "pack_size": pack,
+        "case_size": pack * rng.choice((2, 4, 6)),
+        "pallet_size": pack * rng.choice((40, 80, 120)),
+        "barcode": str(rng.randrange(10**12, 10**13)),
+        "barcode_type": rng.choice(BARCODE_TYPES),
+        "attributes": {"color": rng.choice(p.words), "flavor": rng.choice(p.words), "origin": rng.choice(p.countries)},
+        "weight": round(rng.uniform(0.05, 25), 2),
+        "weight_unit": "kg",
+        "dimensions": {
+            "length": round(rng.uniform(5, 60), 1),
+            "width": round(rng.uniform(5, 40), 1),
+            "height": round(rng.uniform(2, 40), 1),
+            "unit": "cm",
+        },
+        "packaging": rng.choice(PACKAGING),
+        "storage": rng.choice(STORAGE),
+        "shelf_life_days": rng.choice((None, 30, 90, 180, 365, 730)),
+        "halal": rng.random() < 0.8,
+        "allow_backorder": rng.random() < 0.2,
+        "is_active": rng.random() < 0.9,
+        "tags": rng.sample(p.words, rng.randint(1, 5)),
+        "certifications": rng.sample(CERTIFICATIONS, rng.randint(0, 2)),
+        "ingredients": rng.sample(p.words, rng.randint(2, 8)),
+        "nutrition_facts": {
+            "calories": round(rng.uniform(0, 900), 1),
+            "fat": round(rng.uniform(0, 60), 1),
+            "protein": round(rng.uniform(0, 40), 1),
+            "carbohydrates": round(rng.uniform(0, 90), 1),
+        },
+        "warranty_months": None,
+        "returnable": rng.random() < 0.7,
+        "images": [entity_id(seed, "files", rng.randrange(plan.files)) for _ in range(rng.randint(1, 4))],
+        "warehouse_availability": [
+            {
+                "warehouse_id": entity_id(seed, "warehouses", w),
+                "product_id": pid,
+                "quantity": rng.randrange(0, 5_000),
+                "batch_number": f"B{seed}-{i}-{w}",
+                "expiry_date": _stamp(rng) + timedelta(days=365),
+            }
+            for w in warehouses
+        ],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+GENERATORS: Dict[str, Callable[[int, int, SeedPlan], dict]] = {
+    "brands": brand,
+    "categories": category,
+    "warehouses": warehouse,
+    "stores": store,
+    "users": user,
+    "files": file,
+    "products": product,
+}
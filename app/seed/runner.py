@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from app.config import get_settings
+from app.seed.generators import SeedPlan
+from app.seed.writer import insert_chunk, warm_up
+from app.services.versions import collection_versions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SeedReport:
+    inserted: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        lines = [
+            f"{name}: {count} docs in {self.seconds[name]:.2f}s ({_rate(count, self.seconds[name])} docs/sec)"
+            for name, count in self.inserted.items()
+        ]
+        total, elapsed = sum(self.inserted.values()), sum(self.seconds.values())
+        lines.append(f"total: {total} docs in {elapsed:.2f}s ({_rate(total, elapsed)} docs/sec)")
+        return "\n".join(lines)
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:,.0f}" if seconds > 0 else "-"
+
+
+def _executor(workers: int) -> Executor:
+    if workers <= 1:
+        # یک نخ، تا حلقه‌ی رویداد (مثلاً در استارتاپ) بلاک نشود
+        return ThreadPoolExecutor(max_workers=1)
+    # spawn: کلاینت Mongo پردازه‌ی اصلی به فرزندها fork نمی‌شود
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+async def seed(
+    plan: SeedPlan,
+    seed: int = 42,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+) -> SeedReport:
+    """
+    Generate and insert ``plan`` collection by collection; each collection's
+    chunks are spread over ``workers`` processes, which write to MongoDB
+    directly. Re-running with the same seed only fills in missing documents.
+    """
+    settings = get_settings()
+    chunk_size = chunk_size or settings.bulk_chunk_size
+    report = SeedReport()
+    loop = asyncio.get_running_loop()
+    with _executor(workers) as pool:
+        await asyncio.gather(*(loop.run_in_executor(pool, warm_up, seed) for _ in range(max(1, workers))))
+        for name, count in plan.counts().items():
+            started = time.perf_counter()
+            jobs = [
+                loop.run_in_executor(
+                    pool, insert_chunk, settings.mongo_url, settings.mongo_db, name, seed, start,
+                    min(start + chunk_size, count), plan,
+                )
+                for start in range(0, count, chunk_size)
+            ]
+            report.inserted[name] = sum(await asyncio.gather(*jobs))
+            report.seconds[name] = time.perf_counter() - started
+            if report.inserted[name]:
+                await collection_versions.bump(name)
+            logger.info("Seeded %s: %d docs", name, report.inserted[name])
+    return report
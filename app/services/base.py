@@ -1,8 +1,20 @@
-from typing import Type, TypeVar, List, Optional
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Sequence, Tuple, Type, TypeVar, List, Optional
 from uuid import UUID, uuid4
 from pydantic import BaseModel
+from pymongo import DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 
+from app.config import get_settings
 from app.db.mongo import db
+from app.models.bulk import BulkItemResult
+from app.services.cache import EntityCache
+from app.services.decoding import ModelReader, assemble
+from app.services.fields import Fields, partial_model, partial_reader, projection
+from app.services.pagination import CountCache, Page, SortSpec, paginate
+from app.services.references import MissingReferenceError, ReferenceValidator
+from app.services.versions import collection_versions
 
 ModelT = TypeVar("ModelT", bound=BaseModel)
 CreateT = TypeVar("CreateT", bound=BaseModel)
@@ -18,40 +30,275 @@ def _serialize(doc: dict | None):
 
 
 class MongoCRUD:
+    """
+    Repository for one collection. Every entity's UUID is stored as a binary
+    ``_id`` (standard representation), so point reads and ``$in`` batch reads
+    always use the primary index; models expose it as ``id``.
+    """
+
+    # ایندکس‌های کالکشن؛ در استارتاپ یا با `python -m app.db.migrations` ساخته می‌شوند
+    indexes: List[IndexModel] = []
+    sort: SortSpec = [("created_at", DESCENDING), ("_id", DESCENDING)]
+    # موجودیت‌های مرجع که زیاد خوانده و کم تغییر می‌کنند؛ get/get_many از حافظه پاسخ می‌دهند
+    cached: bool = False
+
     def __init__(self, *, collection: str, model_cls: Type[ModelT], create_cls: Type[CreateT], update_cls: Type[UpdateT]):
         self.collection = db[collection]
         self.model_cls = model_cls
         self.create_cls = create_cls
         self.update_cls = update_cls
+        self.reader = ModelReader(model_cls)
+        self.counts = CountCache()
+        self.cache: Optional[EntityCache] = EntityCache(collection) if self.cached else None
+        # کلیدهای خارجی؛ سرویس‌هایی که مرجع دارند در __init__ خودشان مقدار می‌دهند
+        self.references: Optional[ReferenceValidator] = None
 
-    async def create(self, payload: CreateT) -> ModelT:
+    def _from_doc(self, doc: dict) -> ModelT:
+        return self.reader.one(_serialize(doc))
+
+    def _from_docs(self, docs: Iterable[dict], fields: Fields = None) -> List[ModelT]:
+        return self._reader(fields).many(_serialize(doc) for doc in docs)
+
+    def _reader(self, fields: Fields) -> ModelReader:
+        """The full model's reader, or the partial model's one for a ``fields=`` selection."""
+        return self.reader if fields is None else partial_reader(self.model_cls, fields)
+
+    def _stamp(self, data: dict, *fields: str) -> dict:
+        now = datetime.utcnow()
+        for f in fields:
+            if f in self.model_cls.model_fields:
+                data.setdefault(f, now)
+        return data
+
+    def _to_document(self, payload: CreateT) -> dict:
         data = payload.model_dump()
-        _id = str(uuid4())
-        data["_id"] = _id
+        data["_id"] = data.pop("id", None) or uuid4()
+        return self._stamp(data, "created_at", "updated_at")
+
+    async def create(self, payload: CreateT) -> ModelT:
+        if self.references:
+            await self.references.validate(payload)
+        data = self._to_document(payload)
         await self.collection.insert_one(data)
-        data["id"] = _id
-        return self.model_cls(**data)
-
-    async def list(self) -> List[ModelT]:
-        items: List[ModelT] = []
-        async for doc in self.collection.find({}):
-            data = _serialize(doc)
-            items.append(self.model_cls(**data))
-        return items
+        # بعد از نوشتن؛ شمارشی که بین پاک‌کردن و نوشتن انجام شود مقدار قدیمی را دوباره کش می‌کند
+        self.counts.invalidate()
+        await self._bump_version()
+        return self._from_doc(data)
+
+    async def create_many(self, payloads: Sequence[CreateT]) -> List[ModelT]:
+        """Insert all ``payloads`` with one ``insert_many``; all-or-nothing on reference errors."""
+        if not payloads:
+            return []
+        if self.references:
+            errors = await self.references.check(payloads)
+            if errors:
+                raise errors[min(errors)]
+        docs = [self._to_document(payload) for payload in payloads]
+        try:
+            await self.collection.insert_many(docs)
+        finally:
+            # insert_many ممکن است بخشی را نوشته و بعد خطا بدهد
+            self.counts.invalidate()
+        await self._bump_version()
+        return self._from_docs(docs)
+
+    async def check_references(self, payloads: Sequence[BaseModel]) -> Dict[int, MissingReferenceError]:
+        """Foreign-key errors by position in ``payloads``, checked batch-wide by ``self.references``."""
+        if not self.references:
+            return {}
+        return await self.references.check(payloads)
+
+    async def _write_chunks(self, ops: list, write) -> Dict[int, str]:
+        """Run ``write(chunk)`` over ``bulk_chunk_size`` slices; returns write errors by position in ``ops``."""
+        errors: Dict[int, str] = {}
+        size = get_settings().bulk_chunk_size
+        for start in range(0, len(ops), size):
+            try:
+                await write(ops[start:start + size])
+            except BulkWriteError as e:
+                for err in e.details.get("writeErrors", []):
+                    errors[start + err["index"]] = err.get("errmsg", "write failed")
+        return errors
+
+    async def bulk_create(self, items: Sequence[Tuple[int, CreateT]]) -> List[BulkItemResult]:
+        """Unordered chunked ``insert_many``; one result per item, keyed by request index."""
+        results: List[BulkItemResult] = []
+        ref_errors = await self.check_references([payload for _, payload in items])
+        docs: List[Tuple[int, dict]] = []
+        for pos, (index, payload) in enumerate(items):
+            if pos in ref_errors:
+                results.append(BulkItemResult(index=index, status="invalid", error=str(ref_errors[pos])))
+            else:
+                docs.append((index, self._to_document(payload)))
 
-    async def get(self, id_: UUID) -> Optional[ModelT]:
-        doc = await self.collection.find_one({"_id": str(id_)})
+        errors = await self._write_chunks(
+            [doc for _, doc in docs], lambda chunk: self.collection.insert_many(chunk, ordered=False)
+        )
+        self.counts.invalidate()
+        if docs:
+            await self._bump_version()
+        for pos, (index, doc) in enumerate(docs):
+            if pos in errors:
+                results.append(BulkItemResult(index=index, status="failed", error=errors[pos]))
+            else:
+                results.append(BulkItemResult(index=index, id=doc["_id"], status="created"))
+        return results
+
+    async def _bump_version(self) -> int:
+        """Advance the collection version that list ETags are derived from."""
+        version = await collection_versions.bump(self.collection.name)
+        if self.cache is not None:
+            self.cache.advance(version)
+        return version
+
+    def _evict(self, ids: Iterable[UUID]) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(list(ids))
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set:
+        keys = {i for i in ids if i}
+        found: set = set()
+        if self.cache is not None:
+            cached, keys = self.cache.get_many(keys)
+            found.update(cached)
+        if keys:
+            found.update([doc["_id"] async for doc in self.collection.find({"_id": {"$in": list(keys)}}, {"_id": 1})])
+        return found
+
+    async def bulk_update(self, items: Sequence[Tuple[int, UUID, UpdateT]]) -> List[BulkItemResult]:
+        """Unordered chunked ``bulk_write`` of ``$set`` patches; missing ids are reported as not_found."""
+        results: List[BulkItemResult] = []
+        existing, ref_errors = await asyncio.gather(
+            self.existing_ids(id_ for _, id_, _ in items),
+            self.check_references([patch for _, _, patch in items]),
+        )
+        ops: List[UpdateOne] = []
+        targets: List[Tuple[int, UUID]] = []
+        for pos, (index, id_, patch) in enumerate(items):
+            if id_ not in existing:
+                results.append(BulkItemResult(index=index, id=id_, status="not_found"))
+                continue
+            if pos in ref_errors:
+                results.append(BulkItemResult(index=index, id=id_, status="invalid", error=str(ref_errors[pos])))
+                continue
+            data = self._stamp(patch.model_dump(exclude_unset=True), "updated_at")
+            ops.append(UpdateOne({"_id": id_}, {"$set": data}))
+            targets.append((index, id_))
+
+        errors = await self._write_chunks(ops, lambda chunk: self.collection.bulk_write(chunk, ordered=False))
+        self.counts.invalidate()
+        self._evict(id_ for _, id_ in targets)
+        if ops:
+            await self._bump_version()
+        for pos, (index, id_) in enumerate(targets):
+            if pos in errors:
+                results.append(BulkItemResult(index=index, id=id_, status="failed", error=errors[pos]))
+            else:
+                results.append(BulkItemResult(index=index, id=id_, status="updated"))
+        return results
+
+    async def bulk_delete(self, items: Sequence[Tuple[int, UUID]]) -> List[BulkItemResult]:
+        existing = await self.existing_ids(id_ for _, id_ in items)
+        ids = list(existing)
+        size = get_settings().bulk_chunk_size
+        try:
+            for start in range(0, len(ids), size):
+                await self.collection.delete_many({"_id": {"$in": ids[start:start + size]}})
+        finally:
+            self.counts.invalidate()
+        self._evict(ids)
+        if ids:
+            await self._bump_version()
+        return [
+            BulkItemResult(index=index, id=id_, status="deleted" if id_ in existing else "not_found")
+            for index, id_ in items
+        ]
+
+    async def list(
+        self,
+        filters: dict | None = None,
+        page: int = 1,
+        limit: int = 10,
+        cursor: str | None = None,
+        include_total: bool = True,
+        fields: Fields = None,
+    ) -> Page:
+        q = {k: v for k, v in (filters or {}).items() if v is not None}
+        result = await paginate(
+            self.collection, q, self.sort, page, limit, cursor, include_total, self.counts, projection(fields)
+        )
+        return result._replace(items=self._from_docs(result.items, fields))
+
+    async def stream(
+        self, filters: dict | None = None, projection: dict | None = None, batch_size: int | None = None
+    ) -> AsyncIterator[ModelT]:
+        """Yield every matching document in ``sort`` order without holding the result set in memory."""
+        q = {k: v for k, v in (filters or {}).items() if v is not None}
+        batch_size = batch_size or get_settings().export_batch_size
+        cursor = self.collection.find(q, projection).sort(list(self.sort)).batch_size(batch_size)
+        async for doc in cursor:
+            yield self._from_doc(doc)
+
+    async def get(self, id_: UUID, fields: Fields = None) -> Optional[ModelT]:
+        if self.cache is not None:
+            item = self.cache.get(id_)
+            if item is not None:
+                return item if fields is None else self._select(item, fields)
+        if fields is not None:
+            # نسخه‌ی جزئی در کش نمی‌رود
+            doc = await self.collection.find_one({"_id": id_}, projection(fields))
+            return self._reader(fields).one(_serialize(doc)) if doc else None
+        generation = self.cache.generation if self.cache is not None else None
+        doc = await self.collection.find_one({"_id": id_})
         if not doc:
             return None
-        data = _serialize(doc)
-        return self.model_cls(**data)
+        item = self._from_doc(doc)
+        if self.cache is not None:
+            self.cache.set(id_, item, generation)
+        return item
+
+    def _select(self, item: ModelT, fields: Fields) -> BaseModel:
+        """The ``fields`` subset of an already-loaded entity, as the partial model."""
+        partial = partial_model(self.model_cls, fields)
+        return assemble(partial, {name: item.__dict__[name] for name in partial.model_fields})
+
+    async def get_many(self, ids: Iterable[UUID]) -> Dict[UUID, ModelT]:
+        keys = {i for i in ids if i}
+        items: Dict[UUID, ModelT] = {}
+        if self.cache is not None:
+            items, keys = self.cache.get_many(keys)
+        if not keys:
+            return items
+        generation = self.cache.generation if self.cache is not None else None
+        docs = await self.collection.find({"_id": {"$in": list(keys)}}).to_list(None)
+        for item in self._from_docs(docs):
+            items[item.id] = item
+            if self.cache is not None:
+                self.cache.set(item.id, item, generation)
+        return items
 
     async def update(self, id_: UUID, patch: UpdateT) -> Optional[ModelT]:
-        data = patch.model_dump(exclude_unset=True)
-        if data:
-            await self.collection.update_one({"_id": str(id_)}, {"$set": data})
-        return await self.get(id_)
+        if self.references:
+            await self.references.validate(patch)
+        data: Dict[str, Any] = patch.model_dump(exclude_unset=True)
+        self._stamp(data, "updated_at")
+        if not data:
+            return await self.get(id_)
+        doc = await self.collection.find_one_and_update(
+            {"_id": id_}, {"$set": data}, return_document=ReturnDocument.AFTER
+        )
+        self.counts.invalidate()
+        self._evict([id_])
+        if not doc:
+            return None
+        await self._bump_version()
+        return self._from_doc(doc)
 
     async def delete(self, id_: UUID) -> bool:
-        res = await self.collection.delete_one({"_id": str(id_)})
-        return res.deleted_count == 1
+        res = await self.collection.delete_one({"_id": id_})
+        self.counts.invalidate()
+        self._evict([id_])
+        if res.deleted_count != 1:
+            return False
+        await self._bump_version()
+        return True
@@ -0,0 +1,87 @@
+import asyncio
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List
+
+from pymongo import UpdateOne
+
+from app.config import get_settings
+from app.db.mongo import db
+from app.web.compression import SIDECAR_SUFFIXES
+
+
+def blob_path(sha256: str, ext: str) -> str:
+    """Relative location of a blob: ``ab/cd/<sha256>.<ext>``, so no directory grows past 65536 entries per level."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{ext}"
+
+
+def _place(staged: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # محتوای یکسان؛ جایگزینی اتمیک است و بلابی را که هم‌زمان حذف شده برمی‌گرداند
+    os.replace(staged, target)
+
+
+def _unlink(target: Path) -> None:
+    target.unlink(missing_ok=True)
+    for suffix in SIDECAR_SUFFIXES.values():
+        target.with_name(target.name + suffix).unlink(missing_ok=True)
+    # نسخه‌های تصویری (<sha>.thumb.webp) بین بلاب‌های هم‌محتوا با پسوند دیگر (<sha>.jpeg) مشترک‌اند؛
+    # فقط وقتی می‌روند که هیچ بلاب دیگری با همین sha نمانده باشد
+    sha = target.name.split(".", 1)[0]
+    derived = list(target.parent.glob(f"{sha}.*"))
+    if any(p.name.count(".") == 1 for p in derived):
+        return
+    for p in derived:
+        p.unlink(missing_ok=True)
+
+
+class BlobStore:
+    """
+    Content-addressed upload storage under ``root``. Each blob (keyed by its
+    relative path) keeps a count of the ``File`` records pointing at it in
+    ``blobs``; the file on disk is deleted when the last one goes.
+    """
+
+    def __init__(self, root: Path, collection=None):
+        self.root = root
+        self.collection = collection if collection is not None else db["blobs"]
+
+    async def place(self, staged: Path, path: str) -> None:
+        """Move a fully written upload to ``path`` (a rename on the same filesystem, never a copy)."""
+        await asyncio.to_thread(_place, staged, self.root / path)
+
+    async def acquire(self, paths: Iterable[str]) -> None:
+        """Add one reference per occurrence in ``paths`` (a single bulk write)."""
+        counts = Counter(paths)
+        if not counts:
+            return
+        now = datetime.utcnow()
+        await self.collection.bulk_write([
+            UpdateOne({"_id": path}, {"$inc": {"refs": n}, "$setOnInsert": {"created_at": now}}, upsert=True)
+            for path, n in counts.items()
+        ], ordered=False)
+
+    async def release(self, paths: Iterable[str]) -> List[str]:
+        """Drop one reference per occurrence; deletes blobs nobody references any more and returns their paths."""
+        counts = Counter(paths)
+        if not counts:
+            return []
+        await self.collection.bulk_write(
+            [UpdateOne({"_id": path}, {"$inc": {"refs": -n}}) for path, n in counts.items()], ordered=False
+        )
+        unused = [
+            doc["_id"] async for doc in self.collection.find({"_id": {"$in": list(counts)}, "refs": {"$lte": 0}}, {"_id": 1})
+        ]
+        deleted = []
+        for path in unused:
+            # شرط refs در حذف: اگر بین این دو مرحله آپلود تازه‌ای آمده باشد، بلاب می‌ماند
+            res = await self.collection.delete_one({"_id": path, "refs": {"$lte": 0}})
+            if res.deleted_count:
+                await asyncio.to_thread(_unlink, self.root / path)
+                deleted.append(path)
+        return deleted
+
+
+blob_store = BlobStore(Path(get_settings().upload_dir))
@@ -1,65 +1,41 @@
 # app/services/brand_service.py
-from uuid import UUID, uuid4
-from datetime import datetime
-from typing import Tuple, List
+from uuid import UUID
 
 from fastapi import HTTPException
+from pymongo import ASCENDING, IndexModel
 
-from app.db.mongo import db
 from app.models.brand import Brand, BrandCreate, BrandUpdate
+from .base import MongoCRUD
 
 
-class BrandService:
+class BrandService(MongoCRUD):
+    cached = True
+    indexes = [
+        IndexModel(MongoCRUD.sort),
+        IndexModel([("name", ASCENDING)]),
+        IndexModel([("country", ASCENDING)]),
+    ]
+
     def __init__(self):
-        self.collection = db["brands"]
+        super().__init__(
+            collection="brands",
+            model_cls=Brand,
+            create_cls=BrandCreate,
+            update_cls=BrandUpdate
+        )
 
     async def create(self, data: BrandCreate) -> Brand:
-        now = datetime.utcnow()
-        data_dict = data.dict(exclude_unset=True)
-
         # کمربند ایمنی: اگر logo_id هست ولی logo_url ست نشده، رد کن
-        if data_dict.get("logo_id") and not data_dict.get("logo_url"):
+        if data.logo_id and not data.logo_url:
             raise HTTPException(status_code=400, detail="logo_url must be set by server for given logo_id")
-
-        data_dict.setdefault("id", uuid4())
-        data_dict.setdefault("created_at", now)
-        data_dict.setdefault("updated_at", now)
-
-        await self.collection.insert_one(data_dict)
-        return Brand(**data_dict)
-
-    async def get(self, id_: UUID) -> Brand | None:
-        doc = await self.collection.find_one({"id": id_})
-        return Brand(**doc) if doc else None
+        return await super().create(data)
 
     async def update(self, id_: UUID, data: BrandUpdate) -> Brand | None:
-        patch = data.dict(exclude_unset=True)
+        patch = data.model_dump(exclude_unset=True)
         # اگر logo_id کلیدش در پچ هست ولی مقدارش truthy است، باید logo_url هم باشد.
         if "logo_id" in patch and patch.get("logo_id") and not patch.get("logo_url"):
             raise HTTPException(status_code=400, detail="logo_url must be set by server for given logo_id")
-
-        patch["updated_at"] = datetime.utcnow()
-
-        await self.collection.update_one({"id": id_}, {"$set": patch})
-        doc = await self.collection.find_one({"id": id_})
-        return Brand(**doc) if doc else None
-
-    async def delete(self, id_: UUID) -> bool:
-        res = await self.collection.delete_one({"id": id_})
-        return res.deleted_count > 0
-
-    async def list(self, filters: dict | None, page: int, limit: int) -> Tuple[List[Brand], int]:
-        q = {k: v for k, v in (filters or {}).items() if v is not None}
-        cursor = (
-            self.collection
-            .find(q)
-            .skip((page - 1) * limit)
-            .limit(limit)
-            .sort("created_at", -1)
-        )
-        items = [Brand(**doc) async for doc in cursor]
-        total = await self.collection.count_documents(q)
-        return items, total
+        return await super().update(id_, data)
 
 
 brand_service = BrandService()
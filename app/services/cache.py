@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app.config import get_settings
+
+
+class EntityCache:
+    """
+    Bounded LRU cache with a per-entry TTL for read-mostly entities, keyed by id.
+    Each process has its own copy; writes in this process evict immediately.
+    Writes by other workers are noticed through the collection version: whenever
+    versions are read (for ETags) the cache is emptied if its collection moved
+    on, so a body is never older than the version its ETag was built from.
+    Otherwise such entries stay visible for at most ``ttl`` seconds.
+    """
+
+    def __init__(self, name: str, max_entries: int | None = None, ttl: float | None = None):
+        settings = get_settings()
+        self.name = name
+        self.max_entries = settings.entity_cache_size if max_entries is None else max_entries
+        self.ttl = settings.entity_cache_ttl if ttl is None else ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # آخرین نسخه‌ی کالکشن که دیده شده؛ None یعنی هنوز هیچ
+        self.version: Optional[int] = None
+        # با هر invalidate جلو می‌رود؛ بارگذاری‌ای که پیش از آن شروع شده در کش نمی‌نشیند
+        self.generation = 0
+        _caches[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_many(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], Set[Hashable]]:
+        """Cached values by key, plus the keys that have to be loaded."""
+        found: Dict[Hashable, Any] = {}
+        missing: Set[Hashable] = set()
+        for key in keys:
+            value = self.get(key)
+            if value is None:
+                missing.add(key)
+            else:
+                found[key] = value
+        return found, missing
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """``generation``: ``self.generation`` from before the value was loaded; stale loads are dropped."""
+        if not self.enabled or (generation is not None and generation != self.generation):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, keys: Iterable[Hashable] | None = None) -> None:
+        """Drop ``keys``, or everything when no keys are given."""
+        self.generation += 1
+        if keys is None:
+            self._entries.clear()
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def observe(self, version: int) -> None:
+        """The collection is at ``version``; drop everything if it changed since the last one seen."""
+        if self.version is None or version > self.version:
+            self.invalidate()
+            self.version = version
+
+    def advance(self, version: int) -> None:
+        """
+        This process wrote and bumped the collection to ``version``; its own
+        evictions already cover that write, so only a gap (another worker's
+        write in between) empties the cache.
+        """
+        if self.version is not None and version == self.version + 1:
+            self.version = version
+        else:
+            self.observe(version)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+_caches: Dict[str, EntityCache] = {}
+
+
+def observe_versions(versions: Dict[str, int]) -> None:
+    """Reconcile the caches with freshly read collection versions (by collection name)."""
+    for name, version in versions.items():
+        cache = _caches.get(name)
+        if cache is not None:
+            cache.observe(version)
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Counters of every entity cache, by collection name."""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,63 @@
+from functools import lru_cache
+from typing import Generic, Iterable, List, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import get_settings
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+_setattr = object.__setattr__
+
+
+class ModelReader(Generic[ModelT]):
+    """
+    Turns Mongo documents (already passed through ``_serialize``) into models.
+    Documents go through pydantic-core's compiled validator: measured against
+    ``model_construct`` and hand-built instances it is as fast or faster, so
+    nothing is gained by skipping it here. Pages are validated in a single
+    call through a cached ``TypeAdapter`` instead of one ``Model(**doc)`` each.
+    """
+
+    def __init__(self, model_cls: Type[ModelT]):
+        self.model_cls = model_cls
+        self._many = TypeAdapter(List[model_cls])
+
+    def one(self, doc: dict) -> ModelT:
+        return self.model_cls.model_validate(doc)
+
+    def many(self, docs: Iterable[dict]) -> List[ModelT]:
+        return self._many.validate_python(list(docs))
+
+
+@lru_cache(maxsize=None)
+def _field_names(model_cls: Type[BaseModel]) -> frozenset:
+    return frozenset(model_cls.model_fields)
+
+
+@lru_cache(maxsize=None)
+def _plain(model_cls: Type[BaseModel]) -> bool:
+    """Models whose instances are fully described by ``__dict__`` (no private attrs, extras or post-init)."""
+    return (
+        not model_cls.__private_attributes__
+        and model_cls.__pydantic_post_init__ is None
+        and model_cls.model_config.get("extra") != "allow"
+        and not model_cls.__pydantic_root_model__
+    )
+
+
+def assemble(model_cls: Type[ModelT], values: dict) -> ModelT:
+    """
+    Builds ``model_cls`` from parts that are already validated models/values
+    (e.g. a ``Product``'s fields plus its populated relations) without running
+    validation again. ``values`` must hold every field; otherwise, or with
+    ``VALIDATE_READS=true``, the model is validated normally.
+    """
+    if get_settings().validate_reads or values.keys() != _field_names(model_cls) or not _plain(model_cls):
+        return model_cls.model_validate(values)
+    # همان نتیجه‌ی model_construct، بدون حلقه‌ی پیش‌فرض‌ها روی همه‌ی فیلدها
+    m = model_cls.__new__(model_cls)
+    _setattr(m, "__dict__", values)
+    _setattr(m, "__pydantic_fields_set__", set(values))
+    _setattr(m, "__pydantic_extra__", None)
+    _setattr(m, "__pydantic_private__", None)
+    return m
@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import FrozenSet, Mapping, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, Field, create_model
+
+from app.services.decoding import ModelReader
+
+# همیشه خوانده می‌شود ولی فقط اگر درخواست شده باشد در خروجی می‌آید (برای ETag)
+HIDDEN_FIELDS = ("updated_at",)
+
+Fields = Optional[FrozenSet[str]]
+
+
+def parse_fields(raw: Optional[str], model_cls: Type[BaseModel]) -> Fields:
+    """``fields=name,price`` → the requested field names (plus ``id``); None returns everything."""
+    if not raw:
+        return None
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = names - set(model_cls.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(names | {"id"})
+
+
+def parse_expand(raw: Optional[str], allowed: FrozenSet[str]) -> FrozenSet[str]:
+    """``expand=store,brand`` → those relations; ``none`` expands nothing, None (absent) expands all."""
+    if raw is None:
+        return allowed
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    if names == {"none"}:
+        return frozenset()
+    unknown = names - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown relations: {', '.join(sorted(unknown))}")
+    return frozenset(names)
+
+
+def projection(fields: Fields, sources: Mapping[str, str] | None = None) -> Optional[dict]:
+    """
+    Mongo inclusion projection for ``fields``; ``sources`` maps response-only
+    fields to the stored field they are built from (e.g. ``brand`` → ``brand_id``).
+    """
+    if fields is None:
+        return None
+    sources = sources or {}
+    stored = {sources.get(name, name) for name in fields} | set(HIDDEN_FIELDS)
+    return {("_id" if name == "id" else name): 1 for name in sorted(stored)}
+
+
+@lru_cache(maxsize=256)
+def partial_model(model_cls: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """``model_cls`` restricted to ``fields``, cached per field set."""
+    definitions = {}
+    for name, field in model_cls.model_fields.items():
+        if name in fields:
+            definitions[name] = (field.annotation, field)
+        elif name in HIDDEN_FIELDS:
+            definitions[name] = (Optional[field.annotation], Field(None, exclude=True))
+    return create_model(f"{model_cls.__name__}Partial", **definitions)
+
+
+@lru_cache(maxsize=256)
+def partial_reader(model_cls: Type[BaseModel], fields: FrozenSet[str]) -> ModelReader:
+    return ModelReader(partial_model(model_cls, fields))
@@ -1,40 +1,94 @@
-from pydantic import BaseModel
-from uuid import UUID, uuid4
-from datetime import datetime
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from pymongo import ASCENDING, IndexModel
 
-from app.db.mongo import db
 from app.models.file import File, FileCreate, FileUpdate
+from app.web.uploads import StoredUpload
+from .base import MongoCRUD
+from .blobs import BlobStore, blob_path, blob_store
+from .images import ImagePipeline, image_pipeline
+
+STATIC_PREFIX = "/static/"
 
-class MongoCRUD:
-    def __init__(self, collection: str, model_cls: type[BaseModel], create_cls: type[BaseModel], update_cls: type[BaseModel]):
-        self.collection = db[collection]
-        self.model_cls = model_cls
-        self.create_cls = create_cls
-        self.update_cls = update_cls
-
-    async def create(self, data: BaseModel):
-        data_dict = data.dict(exclude_unset=True)
-        data_dict["id"] = data_dict.get("id") or uuid4()
-        data_dict["created_at"] = data_dict.get("created_at") or datetime.utcnow()
-        await self.collection.insert_one(data_dict)
-        return self.model_cls(**data_dict)
-
-    async def get(self, id_: UUID):
-        doc = await self.collection.find_one({"id": id_})
-        return self.model_cls(**doc) if doc else None
-
-    async def update(self, id_: UUID, data: BaseModel):
-        patch = data.dict(exclude_unset=True)
-        await self.collection.update_one({"id": id_}, {"$set": patch})
-        doc = await self.collection.find_one({"id": id_})
-        return self.model_cls(**doc) if doc else None
-
-    async def delete(self, id_: UUID):
-        res = await self.collection.delete_one({"id": id_})
-        return res.deleted_count > 0
 
 class FileService(MongoCRUD):
-    def __init__(self):
-        super().__init__("files", File, FileCreate, FileUpdate)
+    cached = True
+    indexes = [
+        IndexModel(MongoCRUD.sort),
+        IndexModel([("sha256", ASCENDING), ("filename", ASCENDING)]),
+    ]
+
+    def __init__(self, blobs: BlobStore = blob_store, images: ImagePipeline = image_pipeline):
+        super().__init__(
+            collection="files",
+            model_cls=File,
+            create_cls=FileCreate,
+            update_cls=FileUpdate
+        )
+        self.blobs = blobs
+        self.images = images
+
+    async def store_uploads(self, uploads: Sequence[StoredUpload]) -> List[File]:
+        """
+        Move streamed uploads into content-addressed storage and return one
+        ``File`` per upload. Re-uploading the same content under the same
+        filename returns the existing record; any other duplicate gets a new
+        record that shares the blob. Image variants are rendered in the
+        background (or on their first request, whichever comes first).
+        """
+        shas = list({u.sha256 for u in uploads})
+        docs = await self.collection.find({"sha256": {"$in": shas}}).to_list(None)
+        known: Dict[Tuple[str, str], File] = {(f.sha256, f.filename): f for f in self._from_docs(docs)}
+
+        pending: Dict[Tuple[str, str], Tuple[str, FileCreate]] = {}
+        for u in uploads:
+            key = (u.sha256, u.filename)
+            if key not in known and key not in pending:
+                path = blob_path(u.sha256, u.name.rsplit(".", 1)[-1])
+                pending[key] = (path, FileCreate(
+                    url=STATIC_PREFIX + path, filename=u.filename, content_type=u.content_type, size=u.size,
+                    sha256=u.sha256, variants=self._variants(path),
+                ))
+
+        paths = [path for path, _ in pending.values()]
+        # اول ارجاع، بعد جابه‌جایی روی دیسک؛ release هم‌زمان بلاب در حال استفاده را پاک نمی‌کند
+        await self.blobs.acquire(paths)
+        try:
+            await asyncio.gather(*(
+                self.blobs.place(u.path, blob_path(u.sha256, u.name.rsplit(".", 1)[-1])) for u in uploads
+            ))
+            created = await self.create_many([payload for _, payload in pending.values()])
+        except BaseException:
+            await self.blobs.release(paths)
+            raise
+        known.update(zip(pending, created))
+        self.images.schedule(paths)
+        return [known[(u.sha256, u.filename)] for u in uploads]
+
+    def _variants(self, path: str) -> Optional[Dict[str, str]]:
+        return {name: STATIC_PREFIX + p for name, p in self.images.paths(path).items()} or None
+
+    def _blob(self, item: File) -> Optional[str]:
+        if not item.url.startswith(STATIC_PREFIX):
+            return None
+        return item.url[len(STATIC_PREFIX):]
+
+    async def delete(self, id_: UUID) -> bool:
+        item = await self.get(id_)
+        if item is None or not await super().delete(id_):
+            return False
+        path = self._blob(item)
+        if path is None:
+            return True
+        if item.sha256:
+            await self.blobs.release([path])
+        else:
+            # آپلودهای قدیمی (پیش از ذخیره‌سازی محتوامحور) به هیچ سند دیگری تعلق ندارند
+            await asyncio.to_thread(Path(self.blobs.root, path).unlink, missing_ok=True)
+        return True
+
 
 file_service = FileService()
@@ -0,0 +1,189 @@
+"""
+Resized WebP/AVIF derivatives of uploaded images. Rendering is CPU-bound, so
+it runs in a process pool; the files are cached on disk next to the original
+(``ab/cd/<sha>.thumb.webp``) and only rendered once.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Pillow اختیاری است؛ بدون آن مشتق تصویری ساخته نمی‌شود
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover
+    Image = None
+
+RASTER_EXT = ("jpg", "jpeg", "png", "gif", "webp")
+_VARIANT = re.compile(r"^(?P<stem>.+)\.(?P<name>[a-z0-9_]+)\.(?P<fmt>[a-z0-9]+)$")
+
+
+def parse_variants(spec: Iterable[str]) -> Dict[str, int]:
+    """``["thumb:160", "medium:640"]`` → ``{"thumb": 160, "medium": 640}`` (longest side in pixels)."""
+    variants = {}
+    for item in spec:
+        name, _, size = item.strip().partition(":")
+        if name and size.isdigit():
+            variants[name] = int(size)
+    return variants
+
+
+def available_formats(preferred: Iterable[str]) -> List[str]:
+    """``preferred`` minus formats this Pillow build cannot encode."""
+    if Image is None:
+        return []
+    return [f for f in preferred if features.check(f)]
+
+
+def variant_path(path: str, name: str, fmt: str) -> str:
+    return f"{path.rsplit('.', 1)[0]}.{name}.{fmt}"
+
+
+def render(src: str, dest: str, size: int, fmt: str, quality: int) -> None:
+    """Worker-process side: scale ``src`` to fit ``size``×``size`` and save it as ``fmt``."""
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        im.thumbnail((size, size))  # نسبت ابعاد حفظ می‌شود و هیچ‌وقت بزرگ‌تر نمی‌شود
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if im.mode in ("LA", "P", "PA") or "transparency" in im.info else "RGB")
+        # نام موقت یکتا؛ دو پردازه (مثلاً دو worker برنامه) ممکن است هم‌زمان همین مشتق را بسازند
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                im.save(out, format=fmt.upper(), quality=quality)
+            os.chmod(tmp, 0o644)  # mkstemp فقط به مالک دسترسی می‌دهد
+            os.replace(tmp, dest)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+class ImagePipeline:
+    def __init__(
+        self,
+        root: Path,
+        variants: Dict[str, int],
+        formats: Sequence[str],
+        workers: int = 2,
+        quality: int = 80,
+    ):
+        self.root = root
+        self.variants = variants
+        self.formats = list(formats)
+        self.workers = workers
+        self.quality = quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # یک رندر برای هر فایل مقصد، حتی اگر چند درخواست هم‌زمان آن را بخواهند
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.variants and self.formats)
+
+    def paths(self, path: str) -> Dict[str, str]:
+        """Variant name → relative path (in the first format) for an original at ``path``; empty for non-images."""
+        if not self.enabled or path.rsplit(".", 1)[-1].lower() not in RASTER_EXT:
+            return {}
+        return {name: variant_path(path, name, self.formats[0]) for name in self.variants}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _render(self, src: Path, dest: Path, size: int, fmt: str) -> Path:
+        key = str(dest)
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._pool(), render, str(src), key, size, fmt, self.quality)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            await asyncio.shield(future)
+        except BrokenProcessPool:
+            # پردازه‌ای از بین رفته (مثلاً OOM)؛ درخواست بعدی با استخر تازه انجام می‌شود
+            self.shutdown()
+            raise
+        return dest
+
+    async def ensure(self, path: str) -> Optional[Path]:
+        """
+        Render the variant at relative ``path`` (``<stem>.<name>.<fmt>``) if it
+        is a configured variant of an existing original; None otherwise.
+        """
+        path = path.replace(os.sep, "/")
+        match = _VARIANT.match(path)
+        if not self.enabled or not match or match["name"] not in self.variants or match["fmt"] not in self.formats:
+            return None
+        if path.startswith("/") or ".." in path.split("/"):
+            return None
+        dest = self.root / path
+        if await asyncio.to_thread(dest.is_file):
+            return dest
+        src = await asyncio.to_thread(self._original, match["stem"])
+        if src is None:
+            return None
+        try:
+            return await self._render(src, dest, self.variants[match["name"]], match["fmt"])
+        except Exception as e:
+            # فایل خراب یا فرمتی که Pillow نمی‌شناسد؛ مشتقی ساخته نمی‌شود
+            logger.warning("Could not render %s: %s", path, e)
+            return None
+
+    def _original(self, stem: str) -> Optional[Path]:
+        for ext in RASTER_EXT:
+            candidate = self.root / f"{stem}.{ext}"
+            if candidate.is_file():
+                return candidate
+        return None
+
+    async def render_all(self, path: str) -> None:
+        """Every configured size × format of the original at ``path``."""
+        await asyncio.gather(*(
+            self.ensure(variant_path(path, name, fmt)) for name in self.variants for fmt in self.formats
+        ))
+
+    def schedule(self, paths: Iterable[str]) -> None:
+        """Render in the background; the request does not wait, and a miss is rendered on first request."""
+        for path in paths:
+            if not self.paths(path):
+                continue
+            task = asyncio.create_task(self.render_all(path))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _pipeline() -> ImagePipeline:
+    settings = get_settings()
+    return ImagePipeline(
+        Path(settings.upload_dir),
+        parse_variants(settings.image_variants),
+        available_formats(settings.image_formats),
+        workers=settings.image_workers,
+        quality=settings.image_quality,
+    )
+
+
+image_pipeline = _pipeline()
@@ -0,0 +1,183 @@
+import asyncio
+import base64
+import json
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.models.response import PaginationMeta
+
+# (field, direction) pairs; the last one must be a unique tie-breaker such as id
+SortSpec = Sequence[Tuple[str, int]]
+
+
+class Page(NamedTuple):
+    items: list
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+    has_next: bool = False
+
+    def meta(self, page: int, limit: int, cursor: Optional[str] = None) -> PaginationMeta:
+        return PaginationMeta(
+            page=None if cursor else page,
+            limit=limit,
+            total=self.total,
+            total_pages=math.ceil(self.total / limit) if self.total is not None else None,
+            has_next=self.has_next,
+            has_previous=bool(cursor) or page > 1,
+            next_cursor=self.next_cursor,
+        )
+
+
+class CountCache:
+    """
+    Short-lived cache of ``count_documents`` results keyed by the normalized filter.
+    Services clear it after every write to their collection; a count that was
+    already running when the cache was cleared is returned but not cached.
+    """
+
+    def __init__(self, ttl: float | None = None, max_entries: int = 1024):
+        self.ttl = get_settings().count_cache_ttl if ttl is None else ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        # هر invalidate یک نسل جلو می‌رود؛ شمارشی که پیش از آن شروع شده کش نمی‌شود
+        self._generation = 0
+
+    @staticmethod
+    def _key(query: dict) -> str:
+        return json.dumps(query, sort_keys=True, default=str)
+
+    async def count(self, collection, query: dict) -> int:
+        key = self._key(query)
+        hit = self._entries.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+
+        generation = self._generation
+        # بدون فیلتر، شمارش از متادیتای کالکشن خوانده می‌شود و اسکن لازم نیست
+        if query:
+            total = await collection.count_documents(query)
+        else:
+            total = await collection.estimated_document_count()
+
+        if self.ttl > 0 and generation == self._generation:
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl, total)
+        return total
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+
+def _encode_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"$date": v.isoformat()}
+    if isinstance(v, UUID):
+        return {"$uuid": str(v)}
+    return v
+
+
+def _decode_value(v: Any) -> Any:
+    if isinstance(v, dict):
+        if "$date" in v:
+            return datetime.fromisoformat(v["$date"])
+        if "$uuid" in v:
+            return UUID(v["$uuid"])
+    return v
+
+
+def encode_cursor(sort: SortSpec, doc: dict) -> str:
+    payload = {
+        "k": [field for field, _ in sort],
+        "v": [_encode_value(doc.get(field)) for field, _ in sort],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort: SortSpec, cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        keys, values = payload["k"], payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # کرسر فقط برای همان ترتیبی معتبر است که با آن ساخته شده
+    if keys != [field for field, _ in sort] or len(values) != len(keys):
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+    try:
+        return [_decode_value(v) for v in values]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(sort: SortSpec, values: Sequence[Any]) -> dict:
+    """
+    Build the filter selecting documents strictly after ``values`` in ``sort`` order:
+    (k0 > v0) OR (k0 == v0 AND k1 > v1) OR ...
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: values[j] for j, (f, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction > 0 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+async def paginate(
+    collection,
+    query: dict,
+    sort: SortSpec,
+    page: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    counts: Optional[CountCache] = None,
+    projection: Optional[dict] = None,
+    keyset: bool = True,
+) -> Page:
+    """
+    Run a page query in page/limit mode (skip) or keyset mode (cursor).
+    Returns a Page of raw documents; ``limit + 1`` rows are fetched so has_next
+    does not depend on the total, which is only counted when ``include_total``.
+    Sorts on computed values (e.g. text score) pass ``keyset=False``: they only
+    support page/limit and report no next_cursor. Inclusion projections
+    (``fields=``) are widened with the sort keys so the cursor can be built.
+    """
+    find_query = query
+    skip = (page - 1) * limit
+    if projection and keyset and any(v == 1 for v in projection.values()):
+        # کرسر از مقدار فیلدهای sort ساخته می‌شود؛ projection شمولی باید آن‌ها را هم بخواند
+        projection = {**projection, **{field: 1 for field, _ in sort if field not in projection}}
+    if cursor and not keyset:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not available for this sort order")
+    if cursor:
+        after = keyset_filter(sort, decode_cursor(sort, cursor))
+        find_query = {"$and": [query, after]} if query else after
+        skip = 0
+
+    fetch = (
+        collection
+        .find(find_query, projection)
+        .sort(list(sort))
+        .skip(skip)
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    if include_total:
+        count = counts.count(collection, query) if counts else collection.count_documents(query)
+        docs, total = await asyncio.gather(fetch, count)
+    else:
+        docs, total = await fetch, None
+
+    has_next = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = encode_cursor(sort, docs[-1]) if has_next and keyset else None
+    return Page(docs, total, next_cursor, has_next)
@@ -1,23 +1,104 @@
+import asyncio
+import bisect
+import logging
+from functools import lru_cache
 from uuid import UUID
-from typing import List, Optional
-from pymongo import ASCENDING, DESCENDING
-from datetime import datetime
+from typing import FrozenSet, List, Optional, Type
+from fastapi import HTTPException
+from pydantic import create_model
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
 
-from . import file_service
-from .base import MongoCRUD, _serialize
+from .base import MongoCRUD
+from .decoding import assemble
+from .fields import Fields, partial_model, projection as field_projection
+from .pagination import Page, decode_cursor, encode_cursor, paginate
+from .references import Reference, ReferenceValidator
+from .search import InvertedIndex, regex_query, text_query
+from .versions import collection_versions
+from app.config import get_settings
 from app.models.product import (
     Product, ProductCreate, ProductUpdate, ProductResponse, WarehouseAvailabilityResponse
 )
-from app.models.store import Store
-from app.models.category import Category
-from app.models.brand import Brand
-from app.models.warehouse import Warehouse
-from app.db.mongo import db
 from app.services.category_service import category_service
 from app.services.brand_service import brand_service
+from app.services.file_service import file_service
+from app.services.store_service import store_service
+from app.services.warehouse_service import warehouse_service
+
+logger = logging.getLogger(__name__)
+
+# سرویس هر رابطه‌ای که populate از آن می‌خواند؛ نسخه‌ی کالکشن‌شان در ETag محصول لحاظ می‌شود
+RELATED_SERVICES = {
+    "store": store_service,
+    "category": category_service,
+    "brand": brand_service,
+    "warehouse_availability": warehouse_service,
+    "images": file_service,
+}
+RELATED_COLLECTIONS = tuple(s.collection.name for s in RELATED_SERVICES.values())
+
+# فیلدهای پاسخ که از یک شناسه‌ی ذخیره‌شده populate می‌شوند (برای fields=)
+RELATION_SOURCES = {"store": "store_id", "category": "category_id", "brand": "brand_id"}
+# رابطه‌هایی که با expand= قابل انتخاب‌اند؛ پیش‌فرض همه
+EXPANDABLE = frozenset(RELATED_SERVICES)
+
+# وزن فیلدها در امتیاز جستجو (هم برای text index و هم ایندکس درون‌حافظه)
+SEARCH_WEIGHTS = {"name": 10, "full_name": 5, "tags": 3, "description": 1}
+# مقادیری که ایندکس درون‌حافظه کنار هر محصول نگه می‌دارد تا نتایج را بدون Mongo مرتب کند
+SEARCH_VALUES = ("price",)
+SEARCH_FIELDS = set(SEARCH_WEIGHTS) | set(SEARCH_VALUES)
+
+
+@lru_cache(maxsize=None)
+def expanded_model(expand: FrozenSet[str]) -> Type[ProductResponse]:
+    """``ProductResponse`` with only ``expand`` populated; other relations stay as the stored ids."""
+    if expand == EXPANDABLE:
+        return ProductResponse
+    definitions = {}
+    for name, field in ProductResponse.model_fields.items():
+        if name not in EXPANDABLE or name in expand:
+            definitions[name] = (field.annotation, field)
+        elif name in Product.model_fields:
+            # images و warehouse_availability به شکل ذخیره‌شده (شناسه‌ها) برمی‌گردند
+            stored = Product.model_fields[name]
+            definitions[name] = (stored.annotation, stored)
+    return create_model("ProductResponseExpanded", **definitions)
+
+
+def related_collections(expand: FrozenSet[str]) -> tuple:
+    """Collections embedded in a response with ``expand``; only their versions belong in its ETag."""
+    return tuple(RELATED_SERVICES[name].collection.name for name in sorted(expand))
+
+
+def response_model(fields: Fields = None, expand: FrozenSet[str] = EXPANDABLE) -> Type[ProductResponse]:
+    model = expanded_model(expand)
+    return model if fields is None else partial_model(model, fields)
+
+
+def _missing_text_index(error: OperationFailure) -> bool:
+    # IndexNotFound: "text index required for $text query"
+    return error.code == 27 or "text index required" in str(error)
 
 
 class ProductService(MongoCRUD):
+    indexes = [
+        IndexModel(MongoCRUD.sort),
+        IndexModel(
+            [(field, TEXT) for field in SEARCH_WEIGHTS],
+            weights=SEARCH_WEIGHTS,
+            default_language="none",
+            name="product_search",
+        ),
+        IndexModel([("price", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("name", ASCENDING)]),
+        IndexModel([("sku", ASCENDING)]),
+        IndexModel([("brand_id", ASCENDING)]),
+        IndexModel([("category_id", ASCENDING)]),
+        IndexModel([("store_id", ASCENDING)]),
+        IndexModel([("warehouse_availability.warehouse_id", ASCENDING)]),
+    ]
+
     def __init__(self):
         super().__init__(
             collection="products",
@@ -25,34 +106,77 @@ class ProductService(MongoCRUD):
             create_cls=ProductCreate,
             update_cls=ProductUpdate
         )
+        self.search_engine = get_settings().product_search_engine
+        self._text_index_warned = False
+        self.search_index = InvertedIndex(SEARCH_WEIGHTS, SEARCH_VALUES) if self.search_engine == "memory" else None
+        self.references = ReferenceValidator([
+            Reference("brand_id", brand_service, "Brand"),
+            Reference("category_id", category_service, "Category"),
+            Reference("store_id", store_service, "Store"),
+            Reference("images", file_service, "File"),
+            Reference("warehouse_availability.warehouse_id", warehouse_service, "Warehouse"),
+        ])
+
+    async def _bump_version(self) -> int:
+        version = await super()._bump_version()
+        if self.search_index is not None:
+            # این نوشتن را خود سرویس در ایندکس اعمال می‌کند
+            self.search_index.advance(version)
+        return version
+
+    async def refresh_search_index(self) -> int:
+        """Catch the in-memory index up with writes made elsewhere; returns the number of indexed products."""
+        name = self.collection.name
+        version = (await collection_versions.get([name]))[name].number
+        await self.search_index.ensure_built(self.collection, version)
+        return len(self.search_index)
+
+    async def search_ids(self, search: str) -> List[UUID]:
+        await self.refresh_search_index()
+        return self.search_index.search(search)
 
     async def create(self, payload: ProductCreate) -> Product:
-        # Validate foreign keys
-        if payload.brand_id:
-            brand = await brand_service.get(payload.brand_id)
-            if not brand:
-                raise ValueError(f"Brand with id {payload.brand_id} does not exist")
-        if payload.category_id:
-            category = await category_service.get(payload.category_id)
-            if not category:
-                raise ValueError(f"Category with id {payload.category_id} does not exist")
-        return await super().create(payload)
+        product = await super().create(payload)
+        if self.search_index is not None:
+            self.search_index.add(product.id, product.model_dump(include=SEARCH_FIELDS))
+        return product
 
     async def update(self, id_: UUID, patch: ProductUpdate) -> Product | None:
-        # FK checks on update
-        if patch.brand_id:
-            brand = await brand_service.get(patch.brand_id)
-            if not brand:
-                raise ValueError(f"Brand with id {patch.brand_id} does not exist")
-        if patch.category_id:
-            category = await category_service.get(patch.category_id)
-            if not category:
-                raise ValueError(f"Category with id {patch.category_id} does not exist")
-
-        # ensure updated_at
-        patch_dict = patch.dict(exclude_unset=True)
-        patch_dict["updated_at"] = datetime.utcnow()
-        return await super().update(id_, ProductUpdate(**patch_dict))
+        product = await super().update(id_, patch)
+        if product and self.search_index is not None:
+            self.search_index.add(product.id, product.model_dump(include=SEARCH_FIELDS))
+        return product
+
+    async def delete(self, id_: UUID) -> bool:
+        deleted = await super().delete(id_)
+        if deleted and self.search_index is not None:
+            self.search_index.remove(id_)
+        return deleted
+
+    async def bulk_create(self, items):
+        results = await super().bulk_create(items)
+        if self.search_index is not None:
+            payloads = {index: payload for index, payload in items}
+            for r in results:
+                if r.status == "created":
+                    self.search_index.add(r.id, payloads[r.index].model_dump(include=SEARCH_FIELDS))
+        return results
+
+    async def bulk_update(self, items):
+        results = await super().bulk_update(items)
+        if self.search_index is not None:
+            updated = await self.get_many(r.id for r in results if r.status == "updated")
+            for product in updated.values():
+                self.search_index.add(product.id, product.model_dump(include=SEARCH_FIELDS))
+        return results
+
+    async def bulk_delete(self, items):
+        results = await super().bulk_delete(items)
+        if self.search_index is not None:
+            for r in results:
+                if r.status == "deleted":
+                    self.search_index.remove(r.id)
+        return results
 
     async def list(
         self,
@@ -60,87 +184,194 @@ class ProductService(MongoCRUD):
         sort_by_price: Optional[str] = None,
         page: int = 1,
         limit: int = 10,
-    ) -> tuple[list[ProductResponse], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fields: Fields = None,
+        expand: FrozenSet[str] = EXPANDABLE,
+    ) -> Page:
         query = {}
-        if search:
-            query = {
-                "$or": [
-                    {"name": {"$regex": search, "$options": "i"}},
-                    {"full_name": {"$regex": search, "$options": "i"}},
-                    {"description": {"$regex": search, "$options": "i"}},
-                    {"tags": {"$regex": search, "$options": "i"}},
-                ]
-            }
-
-        cursor = self.collection.find(query)
+        sort = self.sort
+        projection = field_projection(fields, RELATION_SOURCES)
+        keyset = True
         if sort_by_price:
             order = ASCENDING if sort_by_price == "asc" else DESCENDING
-            cursor = cursor.sort("price", order)
+            sort = [("price", order), ("_id", order)]
+
+        if search:
+            if self.search_engine == "memory":
+                ids = await self.search_ids(search)
+                if not sort_by_price:
+                    return await self._ranked_page(ids, page, limit, cursor, fields, expand)
+                # مرتب‌سازی قیمت هم در حافظه؛ فهرست شناسه‌های یک عبارت رایج در $in جا نمی‌شود
+                return await self._price_page(ids, sort, page, limit, cursor, fields, expand)
+            elif self.search_engine == "text":
+                query = text_query(search)
+                if not sort_by_price:
+                    # مرتب‌سازی بر اساس ارتباط؛ امتیاز محاسباتی است و کرسر ندارد
+                    projection = {**(projection or {}), "score": {"$meta": "textScore"}}
+                    sort = [("score", {"$meta": "textScore"}), ("_id", DESCENDING)]
+                    keyset = False
+            else:
+                query = regex_query(SEARCH_WEIGHTS, search)
 
-        cursor = cursor.skip((page - 1) * limit).limit(limit)
-        products = [self.model_cls(**_serialize(doc)) async for doc in cursor]
-        total = await self.collection.count_documents(query)
-        return await self._populate(products), total
+        try:
+            result = await paginate(
+                self.collection, query, sort, page, limit, cursor, include_total, self.counts, projection, keyset
+            )
+        except OperationFailure as e:
+            if not (search and self.search_engine == "text" and _missing_text_index(e)):
+                raise
+            # ایندکس product_search ساخته نشده (CREATE_INDEXES_ON_STARTUP=false یا خطای bootstrap)
+            if not self._text_index_warned:
+                logger.warning("Text index product_search is missing, product search falls back to regex: %s", e)
+                self._text_index_warned = True
+            if not sort_by_price:
+                sort, projection = self.sort, field_projection(fields, RELATION_SOURCES)
+            result = await paginate(
+                self.collection, regex_query(SEARCH_WEIGHTS, search), sort, page, limit, cursor,
+                include_total, self.counts, projection, keyset,
+            )
+        products = self._from_docs(result.items, self.stored_fields(fields))
+        return result._replace(items=await self.populate(products, fields, expand))
 
-    async def get(self, id_: UUID) -> ProductResponse | None:
-        product = await super().get(id_)
-        if not product:
+    @staticmethod
+    def stored_fields(fields: Fields) -> Fields:
+        """``Product`` fields backing a ``ProductResponse`` selection (``brand`` → ``brand_id``, ...)."""
+        if fields is None:
             return None
-        populated = await self._populate([product])
+        return frozenset(RELATION_SOURCES.get(name, name) for name in fields)
+
+    async def _ranked_page(
+        self,
+        ids: List[UUID],
+        page: int,
+        limit: int,
+        cursor: Optional[str],
+        fields: Fields = None,
+        expand: FrozenSet[str] = EXPANDABLE,
+    ) -> Page:
+        """A page of in-memory search hits, kept in relevance order."""
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not available for this sort order")
+        start = (page - 1) * limit
+        page_ids = ids[start:start + limit]
+        return Page(await self._products(page_ids, fields, expand), len(ids), None, len(ids) > start + limit)
+
+    async def _price_page(
+        self,
+        ids: List[UUID],
+        sort: list,
+        page: int,
+        limit: int,
+        cursor: Optional[str],
+        fields: Fields = None,
+        expand: FrozenSet[str] = EXPANDABLE,
+    ) -> Page:
+        """A page of in-memory search hits ordered by the price kept in the index; cursors work as in ``paginate``."""
+        hits = self.search_index.order_by(ids, "price")
+        keys = [(price is not None, price or 0, id_.bytes) for price, id_ in hits]
+        descending = sort[0][1] == DESCENDING
+        if cursor:
+            price, id_ = decode_cursor(sort, cursor)
+            after = (price is not None, price or 0, id_.bytes) if isinstance(id_, UUID) else None
+            if after is None:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            start = len(keys) - bisect.bisect_left(keys, after) if descending else bisect.bisect_right(keys, after)
+        else:
+            start = (page - 1) * limit
+        if descending:
+            hits.reverse()
+        chunk = hits[start:start + limit]
+        has_next = len(hits) > start + limit
+        next_cursor = encode_cursor(sort, {"price": chunk[-1][0], "_id": chunk[-1][1]}) if has_next else None
+        return Page(await self._products([id_ for _, id_ in chunk], fields, expand), len(hits), next_cursor, has_next)
+
+    async def _products(self, ids: List[UUID], fields: Fields, expand: FrozenSet[str]) -> list:
+        found = await self.get_many(ids)
+        return await self.populate([found[i] for i in ids if i in found], fields, expand)
+
+    async def get(
+        self, id_: UUID, populate: bool = True, fields: Fields = None, expand: FrozenSet[str] = EXPANDABLE
+    ) -> ProductResponse | Product | None:
+        product = await super().get(id_, self.stored_fields(fields))
+        if not product or not populate:
+            return product
+        populated = await self.populate([product], fields, expand)
         return populated[0]
 
-    async def _populate(self, products: List[Product]) -> List[ProductResponse]:
+    async def populate(
+        self, products: List[Product], fields: Fields = None, expand: FrozenSet[str] = EXPANDABLE
+    ) -> List[ProductResponse]:
+        # همه‌ی شناسه‌های مرجع صفحه را جمع کن تا هر رابطه با یک کوئری $in خوانده شود؛
+        # رابطه‌ای که در expand= (و fields=) نیامده اصلاً خوانده نمی‌شود
+        response_cls = response_model(fields, expand)
+        relations = expand & response_cls.model_fields.keys()
+        if not relations:
+            return self.build_responses(products, {}, {}, {}, {}, {}, response_cls, relations)
+
+        store_ids, category_ids, brand_ids, warehouse_ids, image_ids = set(), set(), set(), set(), set()
+        for p in products:
+            if "store" in relations and p.store_id:
+                store_ids.add(p.store_id)
+            if "category" in relations and p.category_id:
+                category_ids.add(p.category_id)
+            if "brand" in relations and p.brand_id:
+                brand_ids.add(p.brand_id)
+            if "warehouse_availability" in relations:
+                warehouse_ids.update(wa.warehouse_id for wa in (p.warehouse_availability or []))
+            if "images" in relations:
+                image_ids.update(p.images or [])
+
+        stores, categories, brands, warehouses, images = await asyncio.gather(
+            store_service.get_many(store_ids),
+            category_service.get_many(category_ids),
+            brand_service.get_many(brand_ids),
+            warehouse_service.get_many(warehouse_ids),
+            file_service.get_many(image_ids),
+        )
+        return self.build_responses(
+            products, stores, categories, brands, warehouses, images, response_cls, relations
+        )
+
+    @staticmethod
+    def build_responses(
+        products,
+        stores,
+        categories,
+        brands,
+        warehouses,
+        images,
+        response_cls: Type[ProductResponse] = ProductResponse,
+        relations: FrozenSet[str] = EXPANDABLE,
+    ) -> List[ProductResponse]:
+        """Attach the fetched ``relations`` (dicts by id) to each product as ``response_cls``."""
+        # اجزا قبلاً اعتبارسنجی شده‌اند؛ پاسخ بدون dump و اعتبارسنجی دوباره سرهم می‌شود
+        names = response_cls.model_fields
         responses: List[ProductResponse] = []
         for p in products:
-            data = p.model_dump()
-
-            # Store
-            if getattr(p, "store_id", None):
-                store_doc = await db["stores"].find_one({"id": p.store_id})
-                if store_doc:
-                    data["store"] = Store(**_serialize(store_doc))
-
-            # Category
-            if p.category_id:
-                cat_doc = await db["categories"].find_one({"id": p.category_id})
-                if cat_doc:
-                    data["category"] = Category(**_serialize(cat_doc))
-
-            # Brand
-            if p.brand_id:
-                brand_doc = await db["brands"].find_one({"id": p.brand_id})
-                if brand_doc:
-                    bd = _serialize(brand_doc)
-                    bd.pop("_id", None)  # _id لازم نیست
-                    bd["id"] = str(p.brand_id)  # 👈 اطمینان: id = UUID محصول
-                    data["brand"] = Brand(**bd)
-
-            # Warehouses availability
-            wa_list = []
-            for wa in (getattr(p, "warehouse_availability", []) or []):
-                wa_dict = wa.model_dump() if hasattr(wa, "model_dump") else dict(wa)
-                w_doc = await db["warehouses"].find_one({"id": wa_dict.get("warehouse_id")})
-                if w_doc:
-                    wa_dict["warehouse"] = Warehouse(**_serialize(w_doc))
-                wa_list.append(WarehouseAvailabilityResponse(**wa_dict))
-            data["warehouse_availability"] = wa_list
-
-            # Images
-            imgs = []
-            for fid in (getattr(p, "images", []) or []):
-                try:
-                    f_doc = await file_service.get(fid)
-                    if f_doc:
-                        imgs.append(f_doc)
-                except Exception:
-                    # در صورت نبود سرویس فایل یا خطا، فقط رد می‌شویم
-                    pass
-            data["images"] = imgs
-
-            responses.append(ProductResponse(**data))
+            if response_cls is ProductResponse:
+                data = p.__dict__.copy()
+            else:
+                data = {k: v for k, v in p.__dict__.items() if k in names}
+            if "store" in relations:
+                data["store"] = stores.get(p.store_id)
+            if "category" in relations:
+                data["category"] = categories.get(p.category_id)
+            if "brand" in relations:
+                data["brand"] = brands.get(p.brand_id)
+            if "warehouse_availability" in relations:
+                data["warehouse_availability"] = [
+                    assemble(
+                        WarehouseAvailabilityResponse, {**wa.__dict__, "warehouse": warehouses.get(wa.warehouse_id)}
+                    )
+                    for wa in (p.warehouse_availability or [])
+                ]
+            if "images" in relations:
+                data["images"] = [images[fid] for fid in (p.images or []) if fid in images]
+            responses.append(assemble(response_cls, data))
         return responses
 
 
 # Instance for import in routes
 product_service = ProductService()
-__all__ = ["ProductService", "product_service"]
+__all__ = ["ProductService", "product_service", "RELATED_COLLECTIONS", "EXPANDABLE", "expanded_model", "related_collections"]
@@ -0,0 +1,74 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Sequence, Set
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class MissingReferenceError(ValueError):
+    def __init__(self, field: str, label: str, id_: UUID):
+        self.field = field
+        self.id = id_
+        super().__init__(f"{label} with id {id_} does not exist")
+
+
+@dataclass(frozen=True)
+class Reference:
+    """
+    A foreign key on a payload. ``field`` is an attribute name, optionally
+    ``list_field.attr`` for an id inside a list of nested models; lists of ids
+    are followed automatically. ``target`` is any service with ``existing_ids``.
+    """
+    field: str
+    target: Any
+    label: str
+
+    def ids(self, payload: BaseModel) -> Iterator[UUID]:
+        head, _, attr = self.field.partition(".")
+        value = getattr(payload, head, None)
+        if value is None:
+            return
+        values = value if isinstance(value, list) else [value]
+        for v in values:
+            v = getattr(v, attr, None) if attr else v
+            if v:
+                yield v
+
+
+class ReferenceValidator:
+    """
+    Checks every reference of one payload, or of a whole bulk batch, with a single
+    ``$in`` query per target collection; the queries run concurrently.
+    """
+
+    def __init__(self, references: List[Reference]):
+        self.references = references
+
+    async def check(self, payloads: Sequence[BaseModel]) -> Dict[int, MissingReferenceError]:
+        wanted: Dict[int, Set[UUID]] = {}
+        targets: Dict[int, Any] = {}
+        for ref in self.references:
+            key = id(ref.target)
+            targets[key] = ref.target
+            ids = wanted.setdefault(key, set())
+            for payload in payloads:
+                ids.update(ref.ids(payload))
+
+        keys = [k for k in targets if wanted[k]]
+        found = await asyncio.gather(*(targets[k].existing_ids(wanted[k]) for k in keys))
+        existing = dict(zip(keys, found))
+
+        errors: Dict[int, MissingReferenceError] = {}
+        for pos, payload in enumerate(payloads):
+            for ref in self.references:
+                missing = next((i for i in ref.ids(payload) if i not in existing[id(ref.target)]), None)
+                if missing:
+                    errors[pos] = MissingReferenceError(ref.field, ref.label, missing)
+                    break
+        return errors
+
+    async def validate(self, payload: BaseModel) -> None:
+        errors = await self.check([payload])
+        if errors:
+            raise errors[0]
@@ -0,0 +1,156 @@
+import asyncio
+import bisect
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def text_query(search: str) -> dict:
+    """
+    ``$text`` filter for user input. Quotes and leading ``-`` have operator meaning
+    in Mongo text search (phrase / negation), so only plain terms are passed through.
+    """
+    return {"$text": {"$search": " ".join(tokenize(search))}}
+
+
+def regex_query(fields: Iterable[str], search: str) -> dict:
+    """Case-insensitive substring match over ``fields`` with the input escaped literally."""
+    pattern = re.escape(search)
+    return {"$or": [{f: {"$regex": pattern, "$options": "i"}} for f in fields]}
+
+
+class InvertedIndex:
+    """
+    In-process weighted inverted index for small/medium catalogs.
+
+    Every query term must match (AND); the last term also matches as a prefix so
+    search-as-you-type works. The index is per process and remembers the
+    collection version (``_versions``) it reflects: its own service's writes
+    advance it in place, any other write (another worker, the seeder, a
+    migration) moves the version past it and the next search rebuilds it.
+
+    ``values`` are extra fields kept per document (not searched) so hits can be
+    ordered by them without a round trip to Mongo.
+    """
+
+    def __init__(self, weights: Dict[str, float], values: Sequence[str] = ()):
+        self.weights = weights
+        self.values = tuple(values)
+        self._postings: Dict[str, Dict[UUID, float]] = defaultdict(dict)
+        self._terms: Dict[UUID, Set[str]] = {}
+        self._values: Dict[UUID, tuple] = {}
+        self._vocabulary: List[str] = []
+        self._dirty = False
+        self.version: Optional[int] = None
+        self._build_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _field_text(self, value) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return " ".join(str(v) for v in value if v is not None)
+        return str(value)
+
+    def add(self, id_: UUID, doc: dict) -> None:
+        self.remove(id_)
+        scores: Dict[str, float] = defaultdict(float)
+        for field, weight in self.weights.items():
+            for term in tokenize(self._field_text(doc.get(field))):
+                scores[term] += weight
+        for term, score in scores.items():
+            self._postings[term][id_] = score
+        self._terms[id_] = set(scores)
+        self._values[id_] = tuple(doc.get(field) for field in self.values)
+        self._dirty = True
+
+    def remove(self, id_: UUID) -> None:
+        self._values.pop(id_, None)
+        for term in self._terms.pop(id_, ()):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(id_, None)
+                if not posting:
+                    del self._postings[term]
+        self._dirty = True
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._terms.clear()
+        self._values.clear()
+        self._vocabulary = []
+        self._dirty = False
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        if self._dirty:
+            self._vocabulary = sorted(self._postings)
+            self._dirty = False
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str) -> List[UUID]:
+        """Ids of matching documents, best match first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores: Dict[UUID, float] | None = None
+        for i, term in enumerate(terms):
+            expanded = self._prefix_terms(term) if i == len(terms) - 1 else [term]
+            matched: Dict[UUID, float] = defaultdict(float)
+            for t in expanded:
+                for id_, score in self._postings.get(t, {}).items():
+                    matched[id_] += score
+            if scores is None:
+                scores = matched
+            else:
+                scores = {id_: s + matched[id_] for id_, s in scores.items() if id_ in matched}
+            if not scores:
+                return []
+        return sorted(scores, key=lambda id_: (-scores[id_], str(id_)))
+
+    def order_by(self, ids: Iterable[UUID], field: str) -> List[Tuple[Any, UUID]]:
+        """``(value of field, id)`` for ``ids``, ascending; documents without a value sort first."""
+        i = self.values.index(field)
+        keyed = [(self._values[id_][i], id_) for id_ in ids if id_ in self._values]
+        return sorted(keyed, key=lambda kv: (kv[0] is not None, kv[0] or 0, kv[1].bytes))
+
+    async def build(self, collection, version: int) -> int:
+        """
+        (Re)load the index from ``collection``, which is at ``version`` (read
+        before the scan, so a write during it triggers another rebuild).
+        Searches keep using the previous index until the new one is complete.
+        """
+        fresh = InvertedIndex(self.weights, self.values)
+        projection = {field: 1 for field in (*self.weights, *self.values)}
+        async for doc in collection.find({}, projection).batch_size(1000):
+            fresh.add(doc["_id"], doc)
+        self._postings, self._terms, self._values = fresh._postings, fresh._terms, fresh._values
+        self._vocabulary, self._dirty = [], True
+        self.version = version
+        return len(self)
+
+    async def ensure_built(self, collection, version: int) -> None:
+        """Rebuild unless the index is at ``version`` or newer; concurrent searches share one rebuild."""
+        if self.version is not None and self.version >= version:
+            return
+        async with self._build_lock:
+            if self.version is None or self.version < version:
+                await self.build(collection, version)
+
+    def advance(self, version: int) -> None:
+        """
+        This process wrote and bumped the collection to ``version``, and updates
+        the index itself; a gap means someone else wrote too, so it stays stale.
+        """
+        if self.version is not None and version == self.version + 1:
+            self.version = version
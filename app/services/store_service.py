@@ -1,9 +1,38 @@
+from typing import Optional
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
 from app.models.store import Store, StoreCreate, StoreUpdate
 from .base import MongoCRUD
+from .fields import Fields, projection as field_projection
+from .pagination import Page, paginate
+from .references import Reference, ReferenceValidator
+from .search import text_query
 from app.services.warehouse_service import warehouse_service
 
 
+# مقادیر مجاز sort_by در GET /stores
+SORTS = {
+    "name": [("name", ASCENDING), ("_id", ASCENDING)],
+    "name_desc": [("name", DESCENDING), ("_id", DESCENDING)],
+    "created_at": [("created_at", ASCENDING), ("_id", ASCENDING)],
+    "created_at_desc": [("created_at", DESCENDING), ("_id", DESCENDING)],
+}
+
+
 class StoreService(MongoCRUD):
+    cached = True
+    indexes = [
+        IndexModel(MongoCRUD.sort),
+        IndexModel(SORTS["name"]),
+        IndexModel(
+            [("name", TEXT), ("address", TEXT), ("phone", TEXT)],
+            weights={"name": 10, "address": 2, "phone": 5},
+            default_language="none",
+            name="store_search",
+        ),
+    ]
+
     def __init__(self):
         super().__init__(
             collection="stores",
@@ -11,26 +40,34 @@ class StoreService(MongoCRUD):
             create_cls=StoreCreate,
             update_cls=StoreUpdate
         )
+        self.references = ReferenceValidator([Reference("warehouse_ids", warehouse_service, "Warehouse")])
+
+    async def list(
+        self,
+        search: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fields: Fields = None,
+    ) -> Page:
+        query = text_query(search) if search else {}
+        projection = field_projection(fields)
+        keyset = True
+        if sort_by:
+            sort = SORTS[sort_by]
+        elif search:
+            projection = {**(projection or {}), "score": {"$meta": "textScore"}}
+            sort = [("score", {"$meta": "textScore"}), ("_id", DESCENDING)]
+            keyset = False
+        else:
+            sort = self.sort
 
-    async def create(self, payload: StoreCreate) -> Store:
-        # ✅ بررسی وجود warehouse_ids
-        if payload.warehouse_ids:
-            for wid in payload.warehouse_ids:
-                warehouse = await warehouse_service.get(wid)
-                if not warehouse:
-                    raise ValueError(f"Warehouse with id {wid} does not exist")
-
-        return await super().create(payload)
-
-    async def update(self, id_, patch: StoreUpdate) -> Store | None:
-        # ✅ بررسی warehouse_ids در زمان آپدیت هم
-        if patch.warehouse_ids:
-            for wid in patch.warehouse_ids:
-                warehouse = await warehouse_service.get(wid)
-                if not warehouse:
-                    raise ValueError(f"Warehouse with id {wid} does not exist")
-
-        return await super().update(id_, patch)
+        result = await paginate(
+            self.collection, query, sort, page, limit, cursor, include_total, self.counts, projection, keyset
+        )
+        return result._replace(items=self._from_docs(result.items, fields))
 
 
 store_service = StoreService()
@@ -1,8 +1,28 @@
+import re
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+
 from app.models.user import User, UserCreate, UserUpdate
 from .base import MongoCRUD
+from .fields import Fields, projection
+from .pagination import Page, paginate
+
+# رمز عبور هیچ‌وقت در خروجی لیست/استریم خوانده نمی‌شود
+PUBLIC_PROJECTION = {"password": 0}
 
 
 class UserService(MongoCRUD):
+    indexes = [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("username", ASCENDING)], unique=True),
+        IndexModel(MongoCRUD.sort),
+        IndexModel([("roles", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING)]),
+    ]
+
     def __init__(self):
         super().__init__(
             collection="users",
@@ -11,12 +31,66 @@ class UserService(MongoCRUD):
             update_cls=UserUpdate
         )
 
-    # می‌تونی متدهای خاص مثل get_by_email یا get_by_username هم اضافه کنی
+    async def create(self, payload: UserCreate) -> User:
+        try:
+            return await super().create(payload)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=409, detail="A user with this email or username already exists")
+
+    async def update(self, id_, patch: UserUpdate) -> User | None:
+        try:
+            return await super().update(id_, patch)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=409, detail="A user with this email or username already exists")
+
+    @staticmethod
+    def build_filters(
+        role: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        username_prefix: Optional[str] = None,
+    ) -> dict:
+        q = {}
+        if role:
+            q["roles"] = role
+        if is_active is not None:
+            q["is_active"] = is_active
+        if username_prefix:
+            # پیشوند anchored و escape‌شده از ایندکس username استفاده می‌کند
+            q["username"] = {"$regex": "^" + re.escape(username_prefix)}
+        return q
+
+    async def list(
+        self,
+        filters: dict | None = None,
+        page: int = 1,
+        limit: int = 10,
+        cursor: str | None = None,
+        include_total: bool = True,
+        fields: Fields = None,
+    ) -> Page:
+        # projection شمولی fields خودش password را کنار می‌گذارد
+        result = await paginate(
+            self.collection, filters or {}, self.sort, page, limit, cursor, include_total, self.counts,
+            projection(fields) or PUBLIC_PROJECTION,
+        )
+        return result._replace(items=self._from_docs(result.items, fields))
+
+    def stream(
+        self, filters: dict | None = None, projection: dict | None = None, batch_size: int | None = None
+    ) -> AsyncIterator[User]:
+        return super().stream(filters, projection or PUBLIC_PROJECTION, batch_size)
+
     async def get_by_email(self, email: str) -> User | None:
-        doc = await self.collection.find_one({"email": email})
+        doc = await self.collection.find_one({"email": email}, PUBLIC_PROJECTION)
+        if not doc:
+            return None
+        return self._from_doc(doc)
+
+    async def get_by_username(self, username: str) -> User | None:
+        doc = await self.collection.find_one({"username": username}, PUBLIC_PROJECTION)
         if not doc:
             return None
-        return User(**doc)
+        return self._from_doc(doc)
 
 
 user_service = UserService()
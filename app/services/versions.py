@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from pymongo import ReturnDocument
+
+from app.db.mongo import db
+from app.services.cache import observe_versions
+
+
+class Version(NamedTuple):
+    number: int
+    updated_at: Optional[datetime]
+
+
+class CollectionVersions:
+    """
+    Monotonic change counter per collection, kept in ``_versions`` so every worker
+    sees the same value. Services bump it after each write; list ETags are built from it.
+    """
+
+    def __init__(self, collection=None):
+        self.collection = collection if collection is not None else db["_versions"]
+
+    async def bump(self, name: str) -> int:
+        doc = await self.collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["version"]
+
+    async def get(self, names: Iterable[str]) -> Dict[str, Version]:
+        """
+        Current versions of ``names``. Entity caches of those collections are
+        reconciled with them first, so anything rendered after this call is at
+        least as new as the ETag built from it.
+        """
+        names = list(names)
+        found = {doc["_id"]: doc async for doc in self.collection.find({"_id": {"$in": names}})}
+        versions = {
+            name: Version(found[name]["version"], found[name].get("updated_at")) if name in found else Version(0, None)
+            for name in names
+        }
+        observe_versions({name: v.number for name, v in versions.items()})
+        return versions
+
+
+collection_versions = CollectionVersions()
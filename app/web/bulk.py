@@ -0,0 +1,96 @@
+import json
+from typing import Any, List, Tuple, Type
+from uuid import UUID
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from app.config import get_settings
+from app.models.bulk import BulkItemResult
+from app.web.streaming import NDJSON_MEDIA_TYPE
+
+
+async def read_bulk_items(request: Request) -> List[Any]:
+    """Body as a JSON array, or NDJSON (one item per line) when sent as application/x-ndjson."""
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body or b"[]")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk body: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Bulk body must be a JSON array or NDJSON")
+    if len(items) > get_settings().bulk_max_items:
+        raise HTTPException(status_code=413, detail=f"At most {get_settings().bulk_max_items} items per request")
+    return items
+
+
+def _error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+
+def parse_create_items(raw: List[Any], model_cls: Type[BaseModel]) -> Tuple[List[Tuple[int, BaseModel]], List[BulkItemResult]]:
+    valid, invalid = [], []
+    for index, item in enumerate(raw):
+        try:
+            valid.append((index, model_cls.model_validate(item)))
+        except ValidationError as e:
+            invalid.append(BulkItemResult(index=index, status="invalid", error=_error(e)))
+    return valid, invalid
+
+
+def parse_update_items(
+    raw: List[Any], model_cls: Type[BaseModel]
+) -> Tuple[List[Tuple[int, UUID, BaseModel]], List[BulkItemResult]]:
+    """Each item is ``{"id": ..., <patch fields>}``."""
+    valid, invalid = [], []
+    for index, item in enumerate(raw):
+        if not isinstance(item, dict) or "id" not in item:
+            invalid.append(BulkItemResult(index=index, status="invalid", error="id: Field required"))
+            continue
+        patch = dict(item)
+        try:
+            id_ = UUID(str(patch.pop("id")))
+        except ValueError:
+            invalid.append(BulkItemResult(index=index, status="invalid", error="id: Input should be a valid UUID"))
+            continue
+        try:
+            valid.append((index, id_, model_cls.model_validate(patch)))
+        except ValidationError as e:
+            invalid.append(BulkItemResult(index=index, id=id_, status="invalid", error=_error(e)))
+    return valid, invalid
+
+
+def parse_ids(raw: List[Any]) -> Tuple[List[Tuple[int, UUID]], List[BulkItemResult]]:
+    valid, invalid = [], []
+    for index, item in enumerate(raw):
+        try:
+            valid.append((index, UUID(str(item))))
+        except ValueError:
+            invalid.append(BulkItemResult(index=index, status="invalid", error="Input should be a valid UUID"))
+    return valid, invalid
+
+
+def bulk_openapi(schema: str, kind: str = "create") -> dict:
+    """``openapi_extra`` documenting a bulk body of ``schema`` items (create/update) or ids (delete)."""
+    ref = {"$ref": f"#/components/schemas/{schema}"}
+    if kind == "delete":
+        item = {"type": "string", "format": "uuid"}
+    elif kind == "update":
+        item = {"allOf": [
+            {"type": "object", "properties": {"id": {"type": "string", "format": "uuid"}}, "required": ["id"]},
+            ref,
+        ]}
+    else:
+        item = ref
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item}},
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "description": "one JSON item per line"}},
+            },
+        }
+    }
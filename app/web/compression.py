@@ -0,0 +1,273 @@
+import mimetypes
+import os
+import stat
+import zlib
+from typing import Iterable, List, Optional, Sequence
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# brotli و zstandard اختیاری‌اند؛ اگر نصب نباشند فقط gzip ارائه می‌شود
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# سطح‌های مناسب برای فشرده‌سازی لحظه‌ای (نه حداکثر نسبت)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+# پسوند فایل‌های از پیش فشرده‌شده‌ی کنار هر فایل استاتیک
+SIDECAR_SUFFIXES = {"br": ".br", "zstd": ".zst", "gzip": ".gz"}
+
+
+class _Gzip:
+    def __init__(self):
+        self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._c = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+COMPRESSORS = {"gzip": _Gzip}
+if brotli is not None:
+    COMPRESSORS["br"] = _Brotli
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _Zstd
+
+
+def available_encodings(preferred: Iterable[str]) -> List[str]:
+    """``preferred`` in order, minus codings whose library is not installed."""
+    return [e for e in preferred if e in COMPRESSORS]
+
+
+def negotiate(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """Best coding from ``available`` (server preference order) by the client's q-values."""
+    if not accept_encoding or not available:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses whose content type matches ``content_types`` (prefixes)
+    once they reach ``minimum_size`` bytes. Streaming bodies are compressed chunk
+    by chunk and flushed, so NDJSON/CSV exports still arrive incrementally.
+    Responses that already carry a Content-Encoding are passed through.
+
+    Every response of a matching content type gets ``Vary: Accept-Encoding``,
+    including ones sent uncompressed (too small, or the client accepts none of
+    ``encodings``), so a shared cache keys all of them by the header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Sequence[str] = ("application/json",),
+        encodings: Sequence[str] = ("gzip",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.encodings = available_encodings(encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        await _CompressedResponder(self, coding, send)(scope, receive)
+
+
+class _CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, coding: Optional[str], send: Send):
+        self.mw = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        await self.mw.app(scope, receive, self.wrapped_send)
+
+    def _negotiable(self, headers: Headers) -> bool:
+        """Whether this response's body depends on Accept-Encoding."""
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        return headers.get("content-type", "").startswith(self.mw.content_types)
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = MutableHeaders(raw=message["headers"])
+            negotiable = self._negotiable(headers)
+            if negotiable and "accept-encoding" not in headers.get("vary", "").lower():
+                # پاسخ فشرده‌نشده هم به Accept-Encoding بستگی دارد
+                headers.add_vary_header("Accept-Encoding")
+            self.passthrough = not negotiable or self.coding is None or message["status"] in (204, 206, 304)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if self.passthrough:
+            await self.send(message)
+            return
+        if message["type"] != "http.response.body":
+            # مثلاً http.response.pathsend؛ بدنه از دست ما خارج است
+            if self.compressor is None:
+                self.passthrough = True
+                await self.send(self.start)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            # پاسخ کوچک تک‌تکه ارزش فشرده‌سازی ندارد
+            if not more_body and len(body) < self.mw.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.compressor = COMPRESSORS[self.coding]()
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.coding
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            await self.send(self.start)
+
+        data = self.compressor.compress(body)
+        data += self.compressor.flush() if more_body else self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves ``<file>.br`` / ``.zst`` / ``.gz`` next to a file
+    when the client accepts that coding, instead of compressing on every request.
+    Files of ``content_types`` always carry ``Vary: Accept-Encoding``, whichever
+    of them is sent.
+    """
+
+    def __init__(
+        self,
+        *args,
+        encodings: Sequence[str] = ("br", "zstd", "gzip"),
+        content_types: Sequence[str] = ("text/", "application/json", "application/javascript", "image/svg+xml"),
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.encodings = [e for e in encodings if e in SIDECAR_SUFFIXES]
+        self.content_types = tuple(content_types)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(str(full_path))[0]
+        negotiable = bool(self.encodings) and (media_type or "").startswith(self.content_types)
+        if "range" not in request_headers:
+            accept = request_headers.get("accept-encoding", "")
+            for coding in self._sidecar_order(accept):
+                sidecar = f"{full_path}{SIDECAR_SUFFIXES[coding]}"
+                try:
+                    sidecar_stat = os.stat(sidecar)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(sidecar_stat.st_mode):
+                    continue
+                response = FileResponse(
+                    sidecar,
+                    status_code=status_code,
+                    stat_result=sidecar_stat,
+                    media_type=media_type,
+                    headers={"Content-Encoding": coding, "Vary": "Accept-Encoding", **self.file_headers(full_path, coding)},
+                )
+                if self.is_not_modified(response.headers, request_headers):
+                    return NotModifiedResponse(response.headers)
+                return response
+        headers = self.file_headers(full_path, None)
+        if negotiable:
+            # نسخه‌ی فشرده‌نشده هم باید در کش مشترک بر اساس Accept-Encoding جدا شود
+            headers["Vary"] = "Accept-Encoding"
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def file_headers(self, full_path, coding: Optional[str]) -> dict:
+        """Extra headers for ``full_path`` served with ``coding`` (None: as is); an ETag here replaces the default."""
+        return {}
+
+    def _sidecar_order(self, accept_encoding: str) -> List[str]:
+        remaining = list(self.encodings)
+        order = []
+        while remaining:
+            coding = negotiate(accept_encoding, remaining)
+            if coding is None:
+                break
+            order.append(coding)
+            remaining.remove(coding)
+        return order
+
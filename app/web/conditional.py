@@ -0,0 +1,79 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.services.versions import Version, collection_versions
+
+# پاسخ‌ها کش می‌شوند ولی هر بار با ETag اعتبارسنجی می‌شوند
+CACHE_CONTROL = "no-cache"
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+
+
+@dataclass
+class Validators:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    def matches(self, request: Request) -> bool:
+        """True when the client's copy is current (If-None-Match, else If-Modified-Since)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            # هدر HTTP دقت ثانیه دارد
+            return _utc(self.last_modified).replace(microsecond=0) <= _utc(since)
+        return False
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(_utc(self.last_modified), usegmt=True)
+        return headers
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+
+def _latest(*dates: Optional[datetime]) -> Optional[datetime]:
+    dates = [_utc(d) for d in dates if d]
+    return max(dates) if dates else None
+
+
+def entity_validators(item, related: Dict[str, Version] | None = None, variant: str = "") -> Validators:
+    """
+    ETag of a single resource from its id and ``updated_at``; ``related``
+    collection versions are mixed in when the body embeds other entities, and
+    ``variant`` (e.g. the ``fields=`` selection) when the body shape varies.
+    Weak, since the envelope's meta (timestamp) differs between responses.
+    """
+    related = related or {}
+    updated_at = getattr(item, "updated_at", None) or getattr(item, "created_at", None)
+    etag = _digest(item.id, updated_at.isoformat() if updated_at else "", variant, *sorted(related.items()))
+    return Validators(f'W/"{etag}"', _latest(updated_at, *(v.updated_at for v in related.values())))
+
+
+async def list_validators(request: Request, *collections: str) -> Validators:
+    """
+    Weak ETag of a listing: the versions of every collection in the body plus
+    the query string, so any write to one of them changes it.
+    """
+    versions = await collection_versions.get(collections)
+    etag = _digest(request.url.query, *sorted(versions.items()))
+    return Validators(f'W/"{etag}"', _latest(*(v.updated_at for v in versions.values())))
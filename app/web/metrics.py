@@ -0,0 +1,115 @@
+"""
+Prometheus metrics for HTTP requests, labelled by route template
+(``/products/{product_id}``, not the concrete path) to keep cardinality bounded.
+Metrics live in the default registry of each worker process.
+"""
+import time
+from typing import Callable, Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED = "<unmatched>"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests, by route template and status", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to send the full response, by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body bytes sent (after compression), by route template",
+    ["method", "route"], buckets=SIZE_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being handled", ["method"])
+
+
+def route_template(scope: Scope, root_path: str = "") -> str:
+    """
+    ``/products/{product_id}`` for ``/products/3f2c...``; ``UNMATCHED`` when no
+    route matched. ``root_path`` is the one before routing: a Mount extends it
+    (``/static``) and everything below a mount counts as one route.
+    """
+    if "endpoint" not in scope:
+        return UNMATCHED
+    if scope.get("root_path", "") != root_path:
+        return scope["root_path"][len(root_path):] + "/{path}"
+    # path خود route در روترهای include‌شده ممکن است نسبی باشد؛ قالب از مسیر واقعی و path_params ساخته می‌شود
+    template = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        head, sep, tail = template.rpartition(str(value))
+        if sep and value != "":
+            template = f"{head}{{{name}}}{tail}"
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Counts requests and records latency and response size per route template.
+    Add it last so it is the outermost middleware and sees the bytes on the wire.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status = 500  # اگر برنامه پیش از شروع پاسخ خطا بدهد
+        declared = None  # Content-Length؛ پاسخ pathsend بدنه‌ای از این مسیر نمی‌فرستد
+        sent = 0
+
+        async def wrapped_send(message: Message) -> None:
+            nonlocal status, declared, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-length":
+                        declared = int(value)
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = route_template(scope, root_path)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(declared if declared is not None else sent)
+
+
+class CacheCollector:
+    """
+    Exposes in-process cache counters (``{"name": {"hits": .., "misses": ..}}``,
+    as returned by ``source``) at scrape time, so the caches need no Prometheus code.
+    """
+
+    def __init__(self, source: Callable[[], Dict[str, dict]]):
+        self.source = source
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache lookups that were served from the cache", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that had to load", labels=["cache"])
+        evictions = CounterMetricFamily("cache_evictions", "Entries evicted to stay within the size limit", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "hits / (hits + misses) since start", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries currently cached", labels=["cache"])
+        for name, stats in self.source().items():
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            evictions.add_metric([name], stats["evictions"])
+            size.add_metric([name], stats["size"])
+            if stats["hit_ratio"] is not None:
+                ratio.add_metric([name], stats["hit_ratio"])
+        return [hits, misses, evictions, ratio, size]
@@ -0,0 +1,41 @@
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.models.response import ApiSuccessResponse, SuccessMeta
+
+# orjson اختیاری است؛ بدون آن به json استاندارد برمی‌گردیم
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class. Pydantic models are written by their compiled
+    serializer (no dict round trip); anything else goes through orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+def success_response(
+    data: Any,
+    meta: SuccessMeta,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """
+    Envelope for already-validated models, serialized straight to JSON.
+    Returning a Response skips FastAPI's ``response_model`` re-validation; the
+    route's ``response_model`` still documents the schema in OpenAPI.
+    """
+    envelope = ApiSuccessResponse.model_construct(data=data, meta=meta)
+    return FastJSONResponse(envelope, status_code=status_code, headers=headers)
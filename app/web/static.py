@@ -0,0 +1,181 @@
+import asyncio
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from app.services.images import ImagePipeline
+from app.web.compression import SIDECAR_SUFFIXES, PrecompressedStaticFiles
+
+# نام بلاب‌های محتوامحور: <sha256>.<ext>
+_BLOB_NAME = re.compile(r"^(?P<sha>[0-9a-f]{64})\.[A-Za-z0-9]+$")
+
+
+class DerivativeStaticFiles(PrecompressedStaticFiles):
+    """
+    Upload storage: a request for an image variant that has not been rendered
+    yet (``<sha>.thumb.webp``) renders it from the original in the image
+    process pool, then serves it like any other file.
+    """
+
+    def __init__(self, *args, pipeline: ImagePipeline, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pipeline = pipeline
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as e:
+            if e.status_code != 404 or await self.pipeline.ensure(path) is None:
+                raise
+        return await super().get_response(path, scope)
+
+
+@dataclass
+class HotFile:
+    path: str
+    mtime_ns: int
+    size: int
+    body: bytes
+    headers: Dict[str, str]
+
+
+class HotFileCache:
+    """
+    LRU of small static files held in memory, bounded by total bytes. Entries
+    are checked against the file's mtime and size on every hit, so a deleted
+    or replaced file is never served from memory.
+    """
+
+    def __init__(self, max_bytes: int, max_file_size: int):
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self._entries: "OrderedDict[str, HotFile]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_file_size > 0
+
+    def get(self, key: str) -> Optional[HotFile]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            try:
+                # stat مستقیم روی حلقه: فایل داغ در کش inode است و این از پرش به نخ ارزان‌تر است
+                st = os.stat(entry.path)
+            except OSError:
+                st = None
+            if st is None or st.st_mtime_ns != entry.mtime_ns or st.st_size != entry.size:
+                self._drop(key)
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, entry: HotFile) -> None:
+        if not self.enabled or entry.size > self.max_file_size:
+            return
+        self._drop(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= old.size
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old.size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class UploadStaticFiles(DerivativeStaticFiles):
+    """
+    ``/static`` for uploads. Stored names never change content (a blob is
+    named after its sha256, older uploads after a uuid), so:
+
+    * every file is sent with ``cache_control`` (immutable by default);
+    * blobs get their sha256 as a strong ETag;
+    * small files are served from a ``HotFileCache`` without touching the
+      thread pool.
+
+    Range and If-Range requests, HEAD, and everything else go through
+    ``FileResponse``, which uses ``http.response.pathsend`` (zero-copy) when
+    the server offers it.
+    """
+
+    def __init__(self, *args, cache_control: str, hot: Optional[HotFileCache] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+        self.hot = hot if hot is not None and hot.enabled else None
+
+    def file_headers(self, full_path, coding: Optional[str]) -> dict:
+        headers = {"Cache-Control": self.cache_control} if self.cache_control else {}
+        match = _BLOB_NAME.match(os.path.basename(full_path))
+        if match:
+            headers["ETag"] = f'"{match["sha"]}-{coding}"' if coding else f'"{match["sha"]}"'
+        return headers
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        request_headers = Headers(scope=scope)
+        cacheable = self.hot is not None and scope["method"] == "GET" and "range" not in request_headers
+        if cacheable:
+            entry = self.hot.get(path)
+            if entry is not None:
+                return self._from_memory(entry, request_headers)
+        response = await super().get_response(path, scope)
+        if (
+            cacheable
+            and type(response) is FileResponse
+            and response.status_code == 200
+            and "content-encoding" not in response.headers
+            and response.stat_result.st_size <= self.hot.max_file_size
+        ):
+            entry = await asyncio.to_thread(self._load, response)
+            if entry is not None:
+                self.hot.set(path, entry)
+                return self._from_memory(entry, request_headers)
+        return response
+
+    def _load(self, response: FileResponse) -> Optional[HotFile]:
+        path = str(response.path)
+        # فایلی که sidecar فشرده دارد بسته به Accept-Encoding پاسخ متفاوتی دارد
+        if any(os.path.exists(path + SIDECAR_SUFFIXES[coding]) for coding in self.encodings):
+            return None
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            body = f.read()
+        if len(body) != st.st_size or st.st_mtime_ns != response.stat_result.st_mtime_ns:
+            return None  # هم‌زمان عوض شده؛ این بار از دیسک
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        return HotFile(path, st.st_mtime_ns, st.st_size, body, headers)
+
+    def _from_memory(self, entry: HotFile, request_headers: Headers) -> Response:
+        if self.is_not_modified(entry.headers, request_headers):
+            return NotModifiedResponse(Headers(entry.headers))
+        return Response(entry.body, headers=entry.headers)
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterable, AsyncIterator, Iterable, Literal, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+ExportFormat = Literal["ndjson", "csv"]
+
+# حجم تقریبی هر تکه‌ی ارسالی؛ ردیف‌ها تا این اندازه جمع و بعد فرستاده می‌شوند
+CHUNK_SIZE = 64 * 1024
+
+
+async def _ndjson_lines(items: AsyncIterable[BaseModel]) -> AsyncIterator[str]:
+    async for item in items:
+        yield item.model_dump_json() + "\n"
+
+
+def _csv_cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return "" if value is None else value
+
+
+async def _csv_lines(items: AsyncIterable[BaseModel], columns: Iterable[str]) -> AsyncIterator[str]:
+    columns = list(columns)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for item in items:
+        row = item.model_dump(mode="json")
+        writer.writerow([_csv_cell(row.get(c)) for c in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _chunked(lines: AsyncIterable[str], gzip: bool) -> AsyncIterator[bytes]:
+    """Batch lines into ~CHUNK_SIZE writes, optionally gzip-compressing incrementally."""
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    pending: list[bytes] = []
+    size = 0
+    async for line in lines:
+        data = line.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            chunk = b"".join(pending)
+            pending, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    tail = b"".join(pending)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
+
+
+def export_response(
+    items: AsyncIterable[BaseModel],
+    model_cls: Type[BaseModel],
+    name: str,
+    fmt: ExportFormat = "ndjson",
+    gzip: bool = False,
+) -> StreamingResponse:
+    """
+    Bulk export as NDJSON or CSV (nested values JSON-encoded), optionally gzipped.
+    Documents are serialized as the cursor yields them, so memory stays constant.
+    """
+    if fmt == "csv":
+        lines, media_type = _csv_lines(items, model_cls.model_fields), CSV_MEDIA_TYPE
+    else:
+        lines, media_type = _ndjson_lines(items), NDJSON_MEDIA_TYPE
+
+    # gzip در سطح انتقال است؛ کلاینت فایل را از حالت فشرده خارج‌شده ذخیره می‌کند
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(_chunked(lines, gzip), media_type=media_type, headers=headers)
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Collection, List, Optional
+
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# داده‌ی هر فایل تا این اندازه جمع و بعد یک‌جا در نخ جدا نوشته می‌شود
+WRITE_BUFFER = 1024 * 1024
+# حداکثر بلوک‌های در صف نوشتن هر فایل؛ اگر دیسک عقب بماند خواندن بدنه صبر می‌کند
+WRITE_QUEUE = 4
+
+
+@dataclass
+class StoredUpload:
+    field_name: str
+    filename: str
+    name: str  # نام فایل ذخیره‌شده در پوشه‌ی آپلود
+    content_type: Optional[str]
+    size: int
+    sha256: str
+    path: Path
+
+
+@dataclass
+class _Part:
+    field_name: str = ""
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    path: Optional[Path] = None
+    size: int = 0
+    pending: List[bytes] = field(default_factory=list)
+    pending_size: int = 0
+    done: bool = False
+    queue: Optional[asyncio.Queue] = None
+    writer: Optional[asyncio.Task] = None
+
+
+class UploadReceiver:
+    """
+    Parses a multipart/form-data body while it arrives and streams every file
+    part straight into ``directory`` (as ``<uuid>.<ext>``), instead of letting
+    Starlette spool it to a temp file first. Disk writes run in worker threads,
+    overlapped with reading the body, and hash the data (sha256) as it is
+    written; limits are enforced before data is written.
+    Files are written under a ``.part`` name and renamed once complete.
+    One instance per request.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        allowed_ext: Collection[str],
+        max_file_size: int,
+        max_files: int,
+        stored_name: Callable[[str], str] = lambda ext: f"{uuid.uuid4()}.{ext}",
+    ):
+        self.directory = directory
+        self.allowed_ext = allowed_ext
+        self.max_file_size = max_file_size
+        self.max_files = max_files
+        self.stored_name = stored_name
+        self._parts: List[_Part] = []
+        self._current = _Part()
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict = {}
+
+    # --- parser callbacks (sync) ---------------------------------------------
+
+    def _on_part_begin(self) -> None:
+        self._current = _Part()
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field, self._header_value = b"", b""
+
+    def _on_headers_finished(self) -> None:
+        part = self._current
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        part.field_name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            return  # فیلد معمولی فرم؛ نادیده گرفته می‌شود
+        filename = Path(options[b"filename"].decode("utf-8", "replace")).name
+        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        if ext not in self.allowed_ext:
+            raise HTTPException(status_code=400, detail=f"فرمت فایل پشتیبانی نمی‌شود: {filename}")
+        if len(self._parts) >= self.max_files:
+            raise HTTPException(status_code=413, detail=f"At most {self.max_files} files per request")
+        content_type = self._headers.get(b"content-type")
+        part.filename = filename
+        part.content_type = content_type.decode("latin-1") if content_type else None
+        part.path = self.directory / self.stored_name(ext)
+        self._parts.append(part)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        part = self._current
+        if part.path is None:
+            return
+        part.size += end - start
+        if part.size > self.max_file_size:
+            raise HTTPException(
+                status_code=413, detail=f"{part.filename} exceeds the {self.max_file_size} byte upload limit"
+            )
+        part.pending.append(data[start:end])
+        part.pending_size += end - start
+
+    def _on_part_end(self) -> None:
+        self._current.done = True
+
+    # --- async side ----------------------------------------------------------
+
+    async def receive(self, request: Request) -> List[StoredUpload]:
+        try:
+            await self._consume(request)
+        except BaseException:
+            # خطا، قطع اتصال یا لغو؛ هیچ فایل نیمه‌کاره‌ای نمی‌ماند
+            await self.discard()
+            raise
+        return [
+            StoredUpload(p.field_name, p.filename, p.path.name, p.content_type, p.size, p.writer.result(), p.path)
+            for p in self._parts
+        ]
+
+    async def _consume(self, request: Request) -> None:
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                await self._dispatch()
+            parser.finalize()
+        except MultipartParseError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid multipart body: {e}")
+        await self._dispatch()
+        if any(not part.done for part in self._parts):
+            raise HTTPException(status_code=400, detail="Incomplete multipart body")
+        await asyncio.gather(*(part.writer for part in self._parts))
+
+    async def _dispatch(self) -> None:
+        """Hand buffered data of each file to its writer task (full buffers, or everything once the part ended)."""
+        for part in self._parts:
+            if part.writer is None:
+                part.queue = asyncio.Queue(WRITE_QUEUE)
+                part.writer = asyncio.create_task(_write(part.path, part.queue))
+            if part.pending and (part.done or part.pending_size >= WRITE_BUFFER):
+                await self._put(part, b"".join(part.pending))
+                part.pending, part.pending_size = [], 0
+            if part.done and part.queue is not None:
+                await self._put(part, None)
+                part.queue = None
+
+    @staticmethod
+    async def _put(part: _Part, block: Optional[bytes]) -> None:
+        # اگر نوشتن شکست خورده باشد، صف دیگر خالی نمی‌شود؛ خطا را همین‌جا بالا بده
+        put = asyncio.ensure_future(part.queue.put(block))
+        await asyncio.wait({put, part.writer}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            part.writer.result()
+
+    async def discard(self) -> None:
+        """Stop pending writes and delete every file of this request."""
+        for part in self._parts:
+            if part.writer is not None and not part.writer.done():
+                part.writer.cancel()
+        await asyncio.gather(*(p.writer for p in self._parts if p.writer), return_exceptions=True)
+        await asyncio.to_thread(_remove, [p.path for p in self._parts])
+
+
+def _temp(path: Path) -> Path:
+    return path.with_name(path.name + ".part")
+
+
+def _append(handle, digest, block: bytes) -> None:
+    # hashlib برای بلوک‌های بزرگ GIL را آزاد می‌کند
+    digest.update(block)
+    handle.write(block)
+
+
+async def _write(path: Path, queue: asyncio.Queue) -> str:
+    """Write the queued blocks to ``path`` (via ``.part``); returns their sha256."""
+    digest = hashlib.sha256()
+    handle = await asyncio.to_thread(open, _temp(path), "wb")
+    try:
+        while (block := await queue.get()) is not None:
+            await asyncio.to_thread(_append, handle, digest, block)
+    finally:
+        await asyncio.to_thread(handle.close)
+    await asyncio.to_thread(os.replace, _temp(path), path)
+    return digest.hexdigest()
+
+
+def _remove(paths: List[Path]) -> None:
+    for path in paths:
+        for p in (path, _temp(path)):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def upload_openapi(field_name: str = "files") -> dict:
+    """``openapi_extra`` for a handler that reads the multipart body itself."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": [field_name],
+                        "properties": {field_name: {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                    }
+                }
+            },
+        }
+    }
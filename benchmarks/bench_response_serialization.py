@@ -0,0 +1,85 @@
+"""
+CPU cost of returning ``GET /products?limit=100`` through FastAPI.
+
+* legacy: the route returns ``ApiSuccessResponse`` and FastAPI re-validates it
+  against ``response_model`` and encodes it with ``jsonable_encoder`` + ``json``.
+* fast: the route returns ``success_response(...)``; the already-validated
+  models are written once by their compiled serializer.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_response_serialization [--items 100] [--requests 200]
+"""
+import argparse
+import time
+from typing import List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.models.product import ProductResponse
+from app.models.response import ApiSuccessResponse, PaginationMeta, SuccessMeta
+from app.web.responses import FastJSONResponse, success_response
+from benchmarks.fixtures import product_responses
+
+
+def build_app(items: list) -> FastAPI:
+    app = FastAPI(default_response_class=JSONResponse)
+
+    def meta(request: Request) -> SuccessMeta:
+        return SuccessMeta(
+            message="products.list.success",
+            method=request.method,
+            path=request.url.path,
+            pagination=PaginationMeta(page=1, limit=len(items), total=len(items)),
+        )
+
+    @app.get("/legacy", response_model=ApiSuccessResponse[List[ProductResponse]])
+    async def legacy(request: Request):
+        return ApiSuccessResponse(data=items, meta=meta(request))
+
+    @app.get("/fast", response_model=ApiSuccessResponse[List[ProductResponse]], response_class=FastJSONResponse)
+    async def fast(request: Request):
+        return success_response(items, meta(request))
+
+    @app.get("/baseline")
+    async def baseline():
+        # هزینه‌ی ثابت TestClient/ASGI بدون سریال‌سازی، برای کسر از نتایج
+        return JSONResponse([])
+
+    return app
+
+
+def measure(client: TestClient, path: str, requests: int) -> float:
+    """Process CPU seconds per request."""
+    for _ in range(5):
+        client.get(path)
+    start = time.process_time()
+    for _ in range(requests):
+        client.get(path)
+    return (time.process_time() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    items = product_responses(args.items)
+    client = TestClient(build_app(items))
+    assert client.get("/legacy").json()["data"] == client.get("/fast").json()["data"], "both paths must emit the same body"
+
+    baseline = measure(client, "/baseline", args.requests)
+    print(f"{args.items} populated products per response, {args.requests} requests, ASGI baseline subtracted")
+    results = {}
+    for name in ("legacy", "fast"):
+        per_request = measure(client, f"/{name}", args.requests) - baseline
+        results[name] = per_request
+        print(f"  {name:<7} {per_request * 1e3:8.2f} ms/request  {per_request / args.items * 1e6:8.1f} us/item")
+    print(f"  speedup {results['legacy'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Requests/sec for catalog thumbnails served from ``/static``, driving the ASGI
+app directly (no HTTP server or sockets, so this measures the app's own cost).
+
+* starlette: the plain ``StaticFiles``.
+* uploads: ``UploadStaticFiles`` with the hot-file cache disabled.
+* uploads+hot: ``UploadStaticFiles`` with the hot-file cache.
+* revalidate: hot cache, every request carries ``If-None-Match`` (304s).
+
+Run from the repository root::
+
+    python -m benchmarks.bench_static_files [--files 200] [--size 8192] [--requests 20000] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+
+from app.services.blobs import blob_path
+from app.services.images import ImagePipeline
+from app.web.static import HotFileCache, UploadStaticFiles
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def write_thumbnails(root: str, count: int, size: int) -> list:
+    paths = []
+    for _ in range(count):
+        data = os.urandom(size)
+        path = blob_path(hashlib.sha256(data).hexdigest(), "webp")
+        os.makedirs(os.path.join(root, os.path.dirname(path)), exist_ok=True)
+        with open(os.path.join(root, path), "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+async def request(app, path: str, headers: list) -> dict:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": f"/{path}", "raw_path": f"/{path}".encode(),
+        "root_path": "", "query_string": b"", "headers": headers, "server": ("test", 80), "client": ("test", 1),
+    }
+    start = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+
+    await app(scope, receive, send)
+    return start
+
+
+async def measure(app, paths: list, requests: int, concurrency: int, etags: dict = None) -> float:
+    rng = random.Random(42)
+    order = [rng.choice(paths) for _ in range(requests)]
+
+    def headers(path):
+        return [(b"if-none-match", etags[path].encode())] if etags else []
+
+    await asyncio.gather(*(request(app, p, headers(p)) for p in paths))  # warm-up
+    started = time.perf_counter()
+    for i in range(0, requests, concurrency):
+        await asyncio.gather(*(request(app, p, headers(p)) for p in order[i:i + concurrency]))
+    return requests / (time.perf_counter() - started)
+
+
+async def etag_of(app, path: str) -> str:
+    return dict((await request(app, path, []))["headers"])[b"etag"].decode()
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        paths = write_thumbnails(root, args.files, args.size)
+        pipeline = ImagePipeline(Path(root), {}, [])
+        apps = {
+            "starlette": StaticFiles(directory=root),
+            "uploads": UploadStaticFiles(directory=root, pipeline=pipeline, cache_control=CACHE_CONTROL),
+            "uploads+hot": UploadStaticFiles(
+                directory=root, pipeline=pipeline, cache_control=CACHE_CONTROL,
+                hot=HotFileCache(64 * 1024 * 1024, 256 * 1024),
+            ),
+        }
+        print(f"{args.files} files of {args.size} bytes, {args.requests} requests, concurrency {args.concurrency}")
+        results = {}
+        for name, app in apps.items():
+            results[name] = await measure(app, paths, args.requests, args.concurrency)
+            print(f"{name:>12}: {results[name]:>10,.0f} req/s")
+        hot = apps["uploads+hot"]
+        etags = {p: await etag_of(hot, p) for p in paths}
+        rate = await measure(hot, paths, args.requests, args.concurrency, etags)
+        print(f"{'revalidate':>12}: {rate:>10,.0f} req/s (304)")
+        print(f"hot cache speedup over starlette: {results['uploads+hot'] / results['starlette']:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=8192, help="bytes per thumbnail")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+CPU cost of turning one page of Mongo documents into populated ``ProductResponse``s.
+
+* legacy: ``Model(**doc)`` per document, then ``ProductResponse(**product.model_dump(), ...)``,
+  which dumps every product and validates it a second time.
+* validated: the current code with ``VALIDATE_READS=true``.
+* trusted: the current code (pages validated in one ``TypeAdapter`` call,
+  responses assembled from the validated parts without re-validation).
+
+Run from the repository root::
+
+    python -m benchmarks.bench_trusted_reads [--items 100] [--rounds 200]
+"""
+import argparse
+import time
+
+from app.config import get_settings
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.file import File
+from app.models.product import Product, ProductResponse, WarehouseAvailabilityResponse
+from app.models.store import Store
+from app.models.warehouse import Warehouse
+from app.services.base import _serialize
+from app.services.decoding import ModelReader
+from app.services.product_service import ProductService
+from benchmarks.fixtures import product_documents
+
+RELATED = {"stores": Store, "categories": Category, "brands": Brand, "warehouses": Warehouse, "files": File}
+READERS = {name: ModelReader(cls) for name, cls in {**RELATED, "products": Product}.items()}
+
+
+def legacy_page(docs: dict) -> list:
+    related = {name: {d["_id"]: cls(**_serialize(d)) for d in docs[name]} for name, cls in RELATED.items()}
+    responses = []
+    for p in (Product(**_serialize(d)) for d in docs["products"]):
+        data = p.model_dump()
+        data["store"] = related["stores"].get(p.store_id)
+        data["category"] = related["categories"].get(p.category_id)
+        data["brand"] = related["brands"].get(p.brand_id)
+        data["warehouse_availability"] = [
+            WarehouseAvailabilityResponse(**wa.model_dump(), warehouse=related["warehouses"].get(wa.warehouse_id))
+            for wa in p.warehouse_availability or []
+        ]
+        data["images"] = [related["files"][fid] for fid in p.images or [] if fid in related["files"]]
+        responses.append(ProductResponse(**data))
+    return responses
+
+
+def current_page(docs: dict) -> list:
+    """What ``ProductService.list`` + ``populate`` do once the documents are fetched."""
+    related = {
+        name: {m.id: m for m in READERS[name].many(_serialize(d) for d in docs[name])}
+        for name in RELATED
+    }
+    products = READERS["products"].many(_serialize(d) for d in docs["products"])
+    return ProductService.build_responses(
+        products, related["stores"], related["categories"], related["brands"], related["warehouses"], related["files"]
+    )
+
+
+def measure(build, docs: dict, rounds: int) -> float:
+    build(docs)
+    start = time.process_time()
+    for _ in range(rounds):
+        build(docs)
+    return (time.process_time() - start) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    docs = product_documents(args.items)
+    expected = [r.model_dump_json() for r in legacy_page(docs)]
+    assert [r.model_dump_json() for r in current_page(docs)] == expected, "responses must be identical"
+
+    print(f"{args.items} products per page, {args.rounds} rounds")
+    results = {}
+    for name, build, validate in (
+        ("legacy", legacy_page, True),
+        ("validated", current_page, True),
+        ("trusted", current_page, False),
+    ):
+        settings.validate_reads = validate
+        per_page = measure(build, docs, args.rounds)
+        results[name] = per_page
+        print(f"  {name:<9} {per_page * 1e3:8.2f} ms/page  {per_page / args.items * 1e6:8.1f} us/item")
+    print(f"  speedup vs legacy {results['legacy'] / results['trusted']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
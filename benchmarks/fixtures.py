@@ -0,0 +1,117 @@
+"""Synthetic, fully populated product documents for the benchmarks (no MongoDB needed)."""
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+
+def _stamp(rng: random.Random) -> datetime:
+    # دقت میلی‌ثانیه، مثل BSON
+    return (datetime(2025, 1, 1) + timedelta(seconds=rng.randint(0, 10**7))).replace(microsecond=rng.randint(0, 999) * 1000)
+
+
+def _entity(rng: random.Random, **fields) -> dict:
+    now = _stamp(rng)
+    return {"_id": uuid4(), "created_at": now, "updated_at": now, **fields}
+
+
+def product_documents(n: int = 100, seed: int = 42) -> dict:
+    """
+    ``n`` raw product documents (as Motor returns them) plus the related
+    documents they reference, keyed by collection name.
+    """
+    rng = random.Random(seed)
+    warehouses = [_entity(rng, name=f"Warehouse {i}", location="Tehran", capacity=10_000) for i in range(5)]
+    files = [_entity(rng, url=f"/static/{i}.jpg", filename=f"{i}.jpg", content_type="image/jpeg", size=20_480) for i in range(20)]
+    for f in files:
+        del f["updated_at"]
+    stores = [_entity(rng, name=f"Store {i}", address="Valiasr St.", phone="021-555", warehouse_ids=[w["_id"] for w in warehouses[:2]]) for i in range(3)]
+    brands = [_entity(rng, name=f"Brand {i}", country="IR", website="https://example.com", logo_url="/static/logo.png") for i in range(10)]
+    categories = [_entity(rng, name=f"Category {i}", description="Groceries", image_url="/static/c.png") for i in range(10)]
+
+    products = []
+    for i in range(n):
+        pid = uuid4()
+        products.append(_entity(
+            rng,
+            _id=pid,
+            sku=f"SKU-{i:06d}",
+            name=f"Product {i}",
+            full_name=f"Product {i} family pack",
+            description="A reasonably long product description used for search and display. " * 3,
+            brand_id=rng.choice(brands)["_id"],
+            category_id=rng.choice(categories)["_id"],
+            store_id=rng.choice(stores)["_id"],
+            price=round(rng.uniform(1, 100), 2),
+            wholesale_price=round(rng.uniform(1, 80), 2),
+            purchase_price=round(rng.uniform(1, 60), 2),
+            currency="USD",
+            tax_rate=0.09,
+            pricing_tiers=[{"min_qty": q, "unit_price": round(rng.uniform(1, 50), 2), "currency": "USD"} for q in (10, 50, 100)],
+            unit_of_sale="box",
+            pack_size=6,
+            case_size=24,
+            pallet_size=960,
+            barcode=f"{rng.randint(10**12, 10**13 - 1)}",
+            barcode_type="EAN13",
+            attributes={"color": "red", "flavor": "original", "origin": "IR"},
+            weight=1.25,
+            weight_unit="kg",
+            dimensions={"length": 20.0, "width": 10.0, "height": 5.0, "unit": "cm"},
+            packaging="carton",
+            storage="dry",
+            shelf_life_days=365,
+            halal=True,
+            allow_backorder=False,
+            is_active=True,
+            tags=["snack", "family", f"tag{i % 7}"],
+            certifications=["ISO 22000"],
+            ingredients=["flour", "sugar", "salt"],
+            nutrition_facts={"calories": 250.0, "fat": 10.0, "protein": 5.0, "carbohydrates": 30.0},
+            warranty_months=None,
+            returnable=True,
+            images=[f["_id"] for f in rng.sample(files, 3)],
+            warehouse_availability=[
+                {"warehouse_id": w["_id"], "product_id": pid, "quantity": rng.randint(0, 500),
+                 "batch_number": f"B{i}", "expiry_date": _stamp(rng)}
+                for w in rng.sample(warehouses, 2)
+            ],
+        ))
+    return {
+        "products": products,
+        "warehouses": warehouses,
+        "files": files,
+        "stores": stores,
+        "brands": brands,
+        "categories": categories,
+    }
+
+
+def product_responses(n: int = 100, seed: int = 42) -> list:
+    """``n`` fully populated ``ProductResponse`` models, as ``ProductService.populate`` builds them."""
+    from app.models.brand import Brand
+    from app.models.category import Category
+    from app.models.file import File
+    from app.models.product import Product, ProductResponse, WarehouseAvailabilityResponse
+    from app.models.store import Store
+    from app.models.warehouse import Warehouse
+    from app.services.base import _serialize
+
+    docs = product_documents(n, seed)
+    by_id = {
+        name: {d["_id"]: cls(**_serialize(d)) for d in docs[name]}
+        for name, cls in (("warehouses", Warehouse), ("files", File), ("stores", Store), ("brands", Brand), ("categories", Category))
+    }
+    responses = []
+    for doc in docs["products"]:
+        p = Product(**_serialize(doc))
+        data = p.model_dump()
+        data["store"] = by_id["stores"].get(p.store_id)
+        data["category"] = by_id["categories"].get(p.category_id)
+        data["brand"] = by_id["brands"].get(p.brand_id)
+        data["warehouse_availability"] = [
+            WarehouseAvailabilityResponse(**wa.model_dump(), warehouse=by_id["warehouses"].get(wa.warehouse_id))
+            for wa in p.warehouse_availability
+        ]
+        data["images"] = [by_id["files"][fid] for fid in p.images]
+        responses.append(ProductResponse(**data))
+    return responses
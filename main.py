@@ -1,9 +1,25 @@
+import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from pymongo.errors import PyMongoError
 
 from app.config import get_settings
+from app.db.migrations import MigrationManager
+from app.db.mongo import db
+from app.db.monitoring import pool_monitor
+from app.models.response import ApiErrorResponse, ErrorDetail
+from app.seed import SeedPlan, seed
+from app.services.cache import cache_stats
+from app.services.images import image_pipeline
+from app.services.references import MissingReferenceError
+from app.web.compression import CompressionMiddleware, available_encodings
+from app.web.metrics import CacheCollector, MetricsMiddleware
+from app.web.responses import FastJSONResponse
+from app.web.static import HotFileCache, UploadStaticFiles
+from app.services.product_service import product_service
 from app.routes.product_routes import router as products_router
 from app.routes.store_routes import router as stores_router
 from app.routes.category_routes import router as categories_router
@@ -13,16 +29,49 @@ from app.routes.user_routes import router as users_router
 from app.routes.upload_routes import router as upload_router
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def warn_missing_extras() -> None:
+    # وابستگی‌های اختیاری؛ بدون آن‌ها قابلیت بی‌صدا خاموش نمی‌شود
+    missing = set(settings.compression_encodings) - set(available_encodings(settings.compression_encodings))
+    if settings.compression_enabled and missing:
+        logger.warning("Compression codings unavailable (brotli/zstandard not installed): %s", ", ".join(sorted(missing)))
+    if not image_pipeline.enabled:
+        logger.warning("Image variants disabled: Pillow is not installed or IMAGE_VARIANTS/IMAGE_FORMATS is empty")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    warn_missing_extras()
+    if settings.create_indexes_on_startup:
+        try:
+            report = await MigrationManager(db).run(data=False)
+            logger.info("Index bootstrap: %s", report.summary())
+        except PyMongoError as e:
+            logger.warning("Index bootstrap skipped, MongoDB unavailable: %s", e)
+    if settings.seed_on_startup:
+        try:
+            # فقط دیتابیس خالی؛ سندهای موجود دست نمی‌خورند
+            if await product_service.collection.estimated_document_count() == 0:
+                report = await seed(SeedPlan.scaled(settings.seed_products), settings.seed, settings.seed_workers)
+                logger.info("Seed data:\n%s", report.summary())
+        except PyMongoError as e:
+            logger.warning("Seeding skipped, MongoDB unavailable: %s", e)
+    if product_service.search_index is not None:
+        try:
+            count = await product_service.refresh_search_index()
+            logger.info("Product search index built with %d products", count)
+        except PyMongoError as e:
+            # اولین جست‌وجو دوباره تلاش می‌کند
+            logger.warning("Product search index not built, MongoDB unavailable: %s", e)
     yield
+    image_pipeline.shutdown()
 
 app = FastAPI(
     title=settings.project_name,
     description="🛒 Mock API server for frontend testing until backend is ready",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs",       # Swagger UI
     redoc_url="/redoc",     # Redoc UI
     openapi_url="/openapi.json"
@@ -37,9 +86,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Compression (exports that already set Content-Encoding are left alone)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        content_types=settings.compression_types,
+        encodings=settings.compression_encodings,
+    )
+
+# ✅ Metrics (added last: outermost, so it times the whole stack)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(MissingReferenceError)
+async def missing_reference_handler(request: Request, exc: MissingReferenceError):
+    body = ApiErrorResponse(
+        code=400,
+        message="Referenced resource does not exist",
+        errors=[ErrorDetail(field=exc.field, message=str(exc))],
+    )
+    return JSONResponse(status_code=400, content=body.model_dump())
+
 
 # ✅ Routers
-app.mount("/static", StaticFiles(directory="uploads"), name="static")
+static_files = UploadStaticFiles(
+    directory=settings.upload_dir,
+    pipeline=image_pipeline,
+    cache_control=settings.static_cache_control,
+    content_types=settings.compression_types,
+    hot=HotFileCache(settings.static_hot_cache_size, settings.static_hot_max_file_size),
+)
+app.mount("/static", static_files, name="static")
 app.include_router(users_router, prefix="/users", tags=["Users"])
 app.include_router(upload_router, prefix="/files", tags=["Upload"])
 app.include_router(products_router, prefix="/products", tags=["Products"])
@@ -51,3 +130,26 @@ app.include_router(warehouses_router, prefix="/warehouses", tags=["Warehouses"])
 @app.get("/health", tags=["Health"])
 async def health():
     return {"status": "ok"}
+
+def all_cache_stats() -> dict:
+    # شمارنده‌های کش موجودیت‌ها برای هر کالکشن، و کش فایل‌های استاتیک
+    stats = cache_stats()
+    if static_files.hot is not None:
+        stats["static"] = static_files.hot.stats()
+    return stats
+
+@app.get("/health/cache", tags=["Health"])
+async def health_cache():
+    return all_cache_stats()
+
+@app.get("/health/mongo-pool", tags=["Health"])
+async def health_mongo_pool():
+    # وضعیت استخر اتصال هر سرور؛ برای تنظیم MONGO_MAX_POOL_SIZE با تعداد workerها
+    return {"max_pool_size": settings.mongo_max_pool_size, "pools": pool_monitor.stats()}
+
+if settings.metrics_enabled:
+    REGISTRY.register(CacheCollector(all_cache_stats))
+
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)